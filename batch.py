@@ -0,0 +1,159 @@
+import json
+import os
+import time
+import types
+
+import jsonstore
+import uploads
+
+BATCHES_PATH = os.path.join(".cache", "batches.json")
+
+# Batch endpoints of the Gemini API; the Python SDK has no client for them
+API_URL = "https://generativelanguage.googleapis.com/v1beta"
+DOWNLOAD_URL = "https://generativelanguage.googleapis.com/download/v1beta"
+REQUEST_TIMEOUT = 120
+
+SUCCEEDED = "BATCH_STATE_SUCCEEDED"
+RUNNING_STATES = ("BATCH_STATE_PENDING", "BATCH_STATE_RUNNING")
+# States in which a batch will never produce results
+ENDED_STATES = ("BATCH_STATE_FAILED", "BATCH_STATE_CANCELLED", "BATCH_STATE_EXPIRED")
+
+
+def _call(method, url, api_key, payload=None):
+    """Send a JSON request to the batch API and return the response body."""
+    headers = {"x-goog-api-key": api_key}
+    data = None
+    if payload is not None:
+        headers["Content-Type"] = "application/json"
+        data = json.dumps(payload).encode("utf-8")
+    return uploads.send(method, url, headers, data, REQUEST_TIMEOUT)[1]
+
+
+def _camel_case(name):
+    first, *rest = name.split("_")
+    return first + "".join(word.capitalize() for word in rest)
+
+
+def video_request(key, video_file, prompt, generation_config=None):
+    """One entry of a batch: the prompt against an uploaded video, tagged with key.
+
+    generation_config takes the same keys as the SDK's generate_content.
+    """
+    request = {
+        "contents": [{
+            "role": "user",
+            "parts": [
+                {"file_data": {"file_uri": video_file.uri, "mime_type": video_file.mime_type}},
+                {"text": prompt},
+            ],
+        }],
+    }
+    if generation_config:
+        request["generation_config"] = {_camel_case(name): value for name, value in generation_config.items()}
+    return {"request": request, "metadata": {"key": key}}
+
+
+def submit(api_key, model_name, requests, display_name):
+    """Create a batch job running requests against model_name; returns its name (batches/...)."""
+    payload = {
+        "batch": {
+            "display_name": display_name,
+            "input_config": {"requests": {"requests": requests}},
+        },
+    }
+    operation = json.loads(_call("POST", f"{API_URL}/models/{model_name}:batchGenerateContent", api_key, payload))
+    name = operation.get("name") or operation.get("metadata", {}).get("name")
+    if not name:
+        raise RuntimeError(f"Batch was not created: no name in the response {operation!r:.500}")
+    return name
+
+
+def get(api_key, name):
+    """The current state of a batch job as returned by the API."""
+    return json.loads(_call("GET", f"{API_URL}/{name}", api_key))
+
+
+def state(batch):
+    return batch.get("metadata", {}).get("state") or batch.get("state") or "BATCH_STATE_UNSPECIFIED"
+
+
+def results(api_key, batch):
+    """Yield (key, response, error) for every request of a finished batch.
+
+    Results come back inline for small batches and as a JSON-lines file for
+    large ones; response is the GenerateContentResponse as a dict.
+    """
+    output = batch.get("response") or batch.get("metadata", {}).get("output") or {}
+    inlined = output.get("inlinedResponses", {}).get("inlinedResponses")
+    if inlined is not None:
+        lines = [dict(item, key=item.get("metadata", {}).get("key")) for item in inlined]
+    elif output.get("responsesFile"):
+        body = _call("GET", f"{DOWNLOAD_URL}/{output['responsesFile']}:download?alt=media", api_key)
+        lines = [json.loads(line) for line in body.decode("utf-8").splitlines() if line.strip()]
+    else:
+        lines = []
+    for line in lines:
+        yield line.get("key"), line.get("response"), line.get("error")
+
+
+def response_text(response):
+    """The text of a GenerateContentResponse dict; raises if the model returned none."""
+    candidates = response.get("candidates") or []
+    parts = candidates[0].get("content", {}).get("parts", []) if candidates else []
+    text = "".join(part.get("text", "") for part in parts)
+    if not text:
+        reason = candidates[0].get("finishReason") if candidates else response.get("promptFeedback")
+        raise RuntimeError(f"No summary in the batch response ({reason})")
+    return text
+
+
+def usage(response):
+    """The response's usage metadata with the SDK's attribute names, for report.note_usage."""
+    metadata = response.get("usageMetadata", {})
+    return types.SimpleNamespace(
+        prompt_token_count=metadata.get("promptTokenCount", 0),
+        cached_content_token_count=metadata.get("cachedContentTokenCount", 0),
+        candidates_token_count=metadata.get("candidatesTokenCount", 0),
+        total_token_count=metadata.get("totalTokenCount", 0),
+    )
+
+
+class BatchStore(jsonstore.JsonStore):
+    """Batch jobs submitted but not yet collected, kept in a small JSON file.
+
+    Each entry maps the batch name to its model and the recordings in it,
+    keyed by the same key as the job store, so --collect can finish them in
+    a later run.
+    """
+
+    def __init__(self, path=BATCHES_PATH):
+        super().__init__(path)
+
+    def record(self, name, model_name, recordings):
+        """Remember a submitted batch; recordings maps job keys to what is needed to save each result."""
+        with self._lock:
+            self._load()[name] = {"model": model_name, "submitted": time.time(), "recordings": recordings}
+            self._save()
+
+    def pending(self):
+        """(name, entry) for every batch not yet collected, oldest first."""
+        with self._lock:
+            return sorted(self._load().items(), key=lambda item: item[1]["submitted"])
+
+    def submitted_keys(self):
+        """Job keys of every recording waiting in a batch."""
+        with self._lock:
+            return {key for entry in self._load().values() for key in entry["recordings"]}
+
+    def submitted_paths(self):
+        """Absolute paths of every recording waiting in a batch; --collect archives them from there."""
+        with self._lock:
+            return {
+                os.path.abspath(recording["video_path"])
+                for entry in self._load().values() for recording in entry["recordings"].values()
+            }
+
+    def forget(self, name):
+        with self._lock:
+            if self._load().pop(name, None) is not None:
+                self._save()
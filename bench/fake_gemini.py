@@ -0,0 +1,233 @@
+"""In-process stand-in for the parts of google.generativeai that summarize.py uses.
+
+Latencies are given in simulated seconds and multiplied by time_scale, so a
+three-hour recording can be "processed" in well under a second. Uploaded
+files are described by a FileSpec (simulated size and duration) looked up
+by file name, since the placeholder files on disk are empty.
+"""
+import datetime
+import itertools
+import random
+import threading
+import time
+
+from google.api_core import exceptions
+
+
+class FileSpec:
+    def __init__(self, size_bytes, duration):
+        self.size_bytes = size_bytes
+        self.duration = duration
+
+
+class _State:
+    def __init__(self, name):
+        self.name = name
+
+
+class _VideoMetadata:
+    def __init__(self, duration):
+        self.video_duration = datetime.timedelta(seconds=duration)
+
+
+class FakeFile:
+    def __init__(self, name, display_name, spec, ready_at):
+        self.name = name
+        self.display_name = display_name
+        self.size_bytes = spec.size_bytes
+        self.video_metadata = _VideoMetadata(spec.duration)
+        self.mime_type = "video/quicktime"
+        self.uri = f"https://fake-gemini.local/{name}"
+        self.expiration_time = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(hours=48)
+        self.ready_at = ready_at
+        self.spec = spec
+
+    @property
+    def state(self):
+        return _State("ACTIVE" if time.monotonic() >= self.ready_at else "PROCESSING")
+
+
+class _Usage:
+    def __init__(self, prompt_tokens, output_tokens):
+        self.prompt_token_count = prompt_tokens
+        self.candidates_token_count = output_tokens
+        self.total_token_count = prompt_tokens + output_tokens
+
+
+class _Response:
+    def __init__(self, text, usage):
+        self.text = text
+        self.usage_metadata = usage
+
+
+class FakeModel:
+    def __init__(self, server, model_name):
+        self.server = server
+        self.model_name = f"models/{model_name}"
+
+    def generate_content(self, contents, stream=False, request_options=None, **kwargs):
+        return self.server.generate_content(self, contents)
+
+
+class FakeGemini:
+    """Drop-in replacement for the genai module, with configurable latency, failures and quota.
+
+    upload_bandwidth is in bytes per simulated second; processing and
+    generation take a base time plus a per-video-second time. failure_rate is
+    the chance of any call failing with a 503. rpm maps model names to their
+    generate_content quota per simulated minute; calls over it get a 429
+    with a retry hint.
+    During the first storm_seconds every generate_content call gets a 429.
+    """
+
+    def __init__(self, specs, time_scale=0.002, upload_bandwidth=50_000_000,
+                 processing_base=2.0, processing_per_second=0.1,
+                 generation_base=5.0, generation_per_second=0.02,
+                 call_latency=0.1, failure_rate=0.0, rpm=None, storm_seconds=0.0, seed=0):
+        self.specs = specs
+        self.time_scale = time_scale
+        self.upload_bandwidth = upload_bandwidth
+        self.processing_base = processing_base
+        self.processing_per_second = processing_per_second
+        self.generation_base = generation_base
+        self.generation_per_second = generation_per_second
+        self.call_latency = call_latency
+        self.failure_rate = failure_rate
+        self.rpm = rpm
+        self.storm_seconds = storm_seconds
+
+        self.calls = {}
+        self.errors = {}
+        self.models = {}
+        self.busy = []
+        self.files = {}
+        self._ids = itertools.count()
+        self._random = random.Random(seed)
+        self._generate_times = {}
+        self._lock = threading.Lock()
+        self.started = time.monotonic()
+        self.GenerativeModel = lambda model_name=None, **kwargs: FakeModel(self, model_name)
+
+    def _sleep(self, simulated_seconds):
+        time.sleep(simulated_seconds * self.time_scale)
+
+    def _call(self, operation):
+        with self._lock:
+            self.calls[operation] = self.calls.get(operation, 0) + 1
+            fail = self._random.random() < self.failure_rate
+        if fail:
+            self._error(operation, exceptions.ServiceUnavailable("The model is overloaded (fake)."))
+
+    def _error(self, operation, error):
+        with self._lock:
+            self.errors[operation] = self.errors.get(operation, 0) + 1
+        raise error
+
+    def _busy(self, start, end):
+        with self._lock:
+            self.busy.append((start, end))
+
+    def configure(self, **kwargs):
+        pass
+
+    def upload_file(self, path, **kwargs):
+        self._call("upload")
+        display_name = path.rsplit("/", 1)[-1]
+        spec = self.specs[display_name]
+        start = time.monotonic()
+        self._sleep(self.call_latency + spec.size_bytes / self.upload_bandwidth)
+        processing = self.processing_base + spec.duration * self.processing_per_second
+        ready_at = time.monotonic() + processing * self.time_scale
+        name = f"files/fake-{next(self._ids)}"
+        video_file = FakeFile(name, display_name, spec, ready_at)
+        with self._lock:
+            self.files[name] = video_file
+        self._busy(start, ready_at)
+        return video_file
+
+    def upload_resumable(self, path, video_hash, api_key, sessions, display_name=None, **kwargs):
+        """Stands in for uploads.upload_resumable, which talks HTTP directly rather than through the SDK."""
+        return self.upload_file(path).name
+
+    def get_file(self, name):
+        self._call("get_file")
+        self._sleep(self.call_latency)
+        with self._lock:
+            video_file = self.files.get(name)
+        if video_file is None:
+            self._error("get_file", exceptions.NotFound(f"File {name} not found."))
+        return video_file
+
+    def list_files(self):
+        self._call("list_files")
+        self._sleep(self.call_latency)
+        with self._lock:
+            return list(self.files.values())
+
+    def delete_file(self, name):
+        self._call("delete_file")
+        self._sleep(self.call_latency)
+        with self._lock:
+            self.files.pop(name, None)
+
+    def _check_quota(self, model_name):
+        # Retry hints are given in real seconds so the client's backoff scales with the simulation
+        now = time.monotonic()
+        storm_left = self.storm_seconds * self.time_scale - (now - self.started)
+        if storm_left > 0:
+            self._error("generate_content", exceptions.ResourceExhausted(
+                f"Resource has been exhausted (fake storm). Please retry in {storm_left:.3f}s."
+            ))
+        rpm = (self.rpm or {}).get(model_name)
+        if rpm is None:
+            return
+        window = 60 * self.time_scale
+        with self._lock:
+            times = [t for t in self._generate_times.get(model_name, []) if now - t < window]
+            wait = None
+            if len(times) >= rpm:
+                wait = times[0] + window - now
+            else:
+                times.append(now)
+            self._generate_times[model_name] = times
+        if wait is not None:
+            self._error("generate_content", exceptions.ResourceExhausted(
+                f"Quota exceeded for generate_content requests per minute (fake). Please retry in {wait:.3f}s."
+            ))
+
+    def generate_content(self, model, contents):
+        model_name = model.model_name.split("/")[-1]
+        self._call("generate_content")
+        with self._lock:
+            self.models[model_name] = self.models.get(model_name, 0) + 1
+        self._check_quota(model_name)
+        video_file = next((c for c in contents if isinstance(c, FakeFile)), None)
+        duration = video_file.spec.duration if video_file is not None else 0
+        if video_file is not None and video_file.state.name != "ACTIVE":
+            self._error("generate_content", exceptions.FailedPrecondition("File is not ACTIVE."))
+
+        start = time.monotonic()
+        self._sleep(self.generation_base + duration * self.generation_per_second)
+        self._busy(start, time.monotonic())
+        prompt_tokens = int(duration * 300) + sum(len(c) for c in contents if isinstance(c, str)) // 4
+        return _Response("# Meeting Summary\n\nGenerated by the fake Gemini server.\n", _Usage(prompt_tokens, 1500))
+
+    def idle_seconds(self, wall_start, wall_end):
+        """Wall time during which no upload, processing or generation was in progress."""
+        with self._lock:
+            intervals = sorted(self.busy)
+        busy = 0.0
+        current_start = current_end = None
+        for start, end in intervals:
+            start, end = max(start, wall_start), min(end, wall_end)
+            if end <= start:
+                continue
+            if current_end is None or start > current_end:
+                if current_end is not None:
+                    busy += current_end - current_start
+                current_start, current_end = start, end
+            else:
+                current_end = max(current_end, end)
+        if current_end is not None:
+            busy += current_end - current_start
+        return (wall_end - wall_start) - busy
@@ -0,0 +1,242 @@
+"""Benchmark the summarizer pipeline against a local fake Gemini server.
+
+Each scenario runs process_files_async end to end in a scratch directory,
+with google.generativeai swapped for bench/fake_gemini.py. All latencies,
+quotas, poll intervals and backoff delays are scaled by --time-scale, so the
+scenarios finish in seconds while keeping their shape. Times in the output
+are simulated seconds (real seconds divided by the time scale).
+
+    python bench/run_bench.py                       # all scenarios
+    python bench/run_bench.py backlog --workers 8   # one scenario, overridden
+    python bench/run_bench.py --save bench.json     # keep results as a baseline
+    python bench/run_bench.py --baseline bench.json # exit 1 on a regression
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_gemini import FakeGemini, FileSpec  # noqa: E402
+
+# Simulated size of one second of recording
+BYTES_PER_SECOND = 500_000
+
+SCENARIOS = {
+    # One three-hour all-hands: dominated by upload, processing and one long generation
+    "long": {"files": [3 * 3600], "workers": 1},
+    # A backlog of fifty ten-minute standups: dominated by the request quota
+    "backlog": {"files": [10 * 60] * 50, "workers": 4},
+    # Ten recordings while every generate_content call is rejected with 429 for two minutes
+    "storm": {"files": [10 * 60] * 10, "workers": 4, "storm_seconds": 120},
+}
+
+
+POLLER_SETTINGS = (
+    "PROCESSING_BASE_SECONDS", "PROCESSING_SECONDS_PER_VIDEO_SECOND", "MIN_INTERVAL", "MAX_INTERVAL", "MIN_DEADLINE",
+)
+
+
+@contextlib.contextmanager
+def scaled_client(scale, rpm, tpm):
+    """Shrink the client's quotas, poll intervals and backoff delays to the fake's time scale.
+
+    Yields each routed model's requests-per-minute quota in simulated minutes.
+    """
+    import poller
+    import ratelimit
+    import retry
+    import routing
+
+    settings = {name: getattr(poller, name) for name in POLLER_SETTINGS + ("PROCESSING_BYTES_PER_SECOND",)}
+    policies = (retry.UPLOAD_POLICY, retry.POLL_POLICY, retry.GENERATE_POLICY)
+    delays = [(policy.base_delay, policy.max_delay) for policy in policies]
+
+    for name in POLLER_SETTINGS:
+        setattr(poller, name, settings[name] * scale)
+    poller.PROCESSING_BYTES_PER_SECOND = settings["PROCESSING_BYTES_PER_SECOND"] / scale
+    for policy in policies:
+        policy.base_delay *= scale
+        policy.max_delay *= scale
+    quotas = {}
+    for model in routing.MODELS:
+        default_rpm, default_tpm = ratelimit.MODEL_RATE_LIMITS.get(model, ratelimit.DEFAULT_RATE_LIMIT)
+        quotas[model] = (rpm or default_rpm, tpm or default_tpm)
+        ratelimit.configure(model, quotas[model][0] / scale, quotas[model][1] / scale)
+    ratelimit.configure(ratelimit.FILES_LIMITER, ratelimit.FILES_RPM / scale)
+    try:
+        yield {model: model_rpm for model, (model_rpm, _) in quotas.items()}
+    finally:
+        for name, value in settings.items():
+            setattr(poller, name, value)
+        for policy, (base_delay, max_delay) in zip(policies, delays):
+            policy.base_delay, policy.max_delay = base_delay, max_delay
+        for model in routing.MODELS:
+            ratelimit.configure(model)
+        ratelimit.configure(ratelimit.FILES_LIMITER)
+
+
+def run_scenario(name, scenario, scale, rpm=None, tpm=None, failure_rate=0.0, verbose=False):
+    workdir = tempfile.mkdtemp(prefix=f"bench-{name}-")
+    os.chdir(workdir)
+    os.environ.setdefault("GEMINI_API_KEY", "bench")
+    for directory in ("input", "output", "processed"):
+        os.makedirs(directory, exist_ok=True)
+
+    import cache
+    import jobs
+    import retry
+    import summarize
+    import uploads
+
+    # Fresh state for every scenario, relative to the new working directory
+    summarize.result_cache = cache.ResultCache()
+    summarize.upload_registry = uploads.UploadRegistry()
+    summarize.upload_sessions = uploads.UploadSessions()
+    summarize.job_store = jobs.JobStore()
+    # Models are pooled per process; drop the previous scenario's fakes
+    summarize._models.clear()
+    retry.stats = retry.RetryStats()
+
+    specs = {}
+    mov_files = []
+    for index, duration in enumerate(scenario["files"]):
+        filename = f"{name}-{index:03d}.mov"
+        path = os.path.join("input", filename)
+        with open(path, "w") as f:
+            # Distinct contents so each recording hashes differently
+            f.write(filename)
+        specs[filename] = FileSpec(duration * BYTES_PER_SECOND, duration)
+        mov_files.append(path)
+
+    workers = scenario["workers"]
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    real_genai, real_upload = summarize.genai, uploads.upload_resumable
+    try:
+        with scaled_client(scale, rpm, tpm) as quota, output:
+            fake = FakeGemini(
+                specs, time_scale=scale, failure_rate=failure_rate, rpm=quota,
+                storm_seconds=scenario.get("storm_seconds", 0.0),
+            )
+            summarize.genai = fake
+            uploads.upload_resumable = fake.upload_resumable
+            start = time.monotonic()
+            results = asyncio.run(summarize.process_files_async(
+                mov_files, None, workers=workers, pipeline=workers == 1, use_cache=False,
+            ))
+            end = time.monotonic()
+    finally:
+        summarize.genai, uploads.upload_resumable = real_genai, real_upload
+        os.chdir(ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    wall = (end - start) / scale
+    idle = fake.idle_seconds(start, end) / scale
+    return {
+        "scenario": name,
+        "files": len(mov_files),
+        "workers": workers,
+        "ok": sum(1 for path in results.values() if path),
+        "failed": sum(1 for path in results.values() if not path),
+        "wall_seconds": round(wall, 1),
+        "idle_seconds": round(idle, 1),
+        "idle_fraction": round(idle / wall, 3) if wall else 0.0,
+        "calls": dict(sorted(fake.calls.items())),
+        "api_calls": sum(fake.calls.values()),
+        "errors": dict(sorted(fake.errors.items())),
+        "models": dict(sorted(fake.models.items())),
+    }
+
+
+def print_result(result):
+    print(f"{result['scenario']}: {result['files']} files, {result['workers']} workers")
+    print(f"  {result['ok']} ok, {result['failed']} failed")
+    print(f"  Wall time: {result['wall_seconds']:.0f}s simulated, "
+          f"idle {result['idle_seconds']:.0f}s ({result['idle_fraction']:.0%})")
+    calls = ", ".join(f"{op} {count}" for op, count in result["calls"].items())
+    print(f"  API calls: {result['api_calls']} ({calls})")
+    models = ", ".join(f"{model} {count}" for model, count in result["models"].items())
+    print(f"  Generation requests by model: {models}")
+    if result["errors"]:
+        errors = ", ".join(f"{op} {count}" for op, count in result["errors"].items())
+        print(f"  Errors: {errors}")
+
+
+def regressions(results, baseline, tolerance):
+    """Lines describing results that got worse than the baseline by more than tolerance."""
+    previous = {r["scenario"]: r for r in baseline}
+    problems = []
+    for result in results:
+        before = previous.get(result["scenario"])
+        if before is None:
+            continue
+        if result["failed"] > before["failed"]:
+            problems.append(f"{result['scenario']}: {result['failed']} failed (was {before['failed']})")
+        for metric in ("wall_seconds", "api_calls"):
+            if result[metric] > before[metric] * (1 + tolerance):
+                problems.append(
+                    f"{result['scenario']}: {metric} {result[metric]} (was {before[metric]}, "
+                    f"tolerance {tolerance:.0%})"
+                )
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the summarizer against a fake Gemini server.")
+    parser.add_argument("scenarios", nargs="*",
+                        help=f"Scenarios to run: {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument("--time-scale", type=float, default=0.002,
+                        help="Real seconds per simulated second (default: 0.002)")
+    parser.add_argument("--workers", type=int, help="Override each scenario's worker count")
+    parser.add_argument("--rpm", type=int, help="Requests per minute quota per model (default: each model's free tier)")
+    parser.add_argument("--tpm", type=int, help="Tokens per minute quota per model (default: each model's free tier)")
+    parser.add_argument("--failure-rate", type=float, default=0.0,
+                        help="Chance of any API call failing with a 503 (default: 0)")
+    parser.add_argument("--save", help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", help="Compare against results saved earlier with --save")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown against the baseline (default: 0.25)")
+    parser.add_argument("--verbose", "-v", action="store_true", help="Show the summarizer's own output")
+    args = parser.parse_args()
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario: {', '.join(unknown)}")
+
+    results = []
+    for name in args.scenarios or list(SCENARIOS):
+        scenario = dict(SCENARIOS[name])
+        if args.workers:
+            scenario["workers"] = args.workers
+        result = run_scenario(
+            name, scenario, args.time_scale, args.rpm, args.tpm, args.failure_rate, args.verbose,
+        )
+        print_result(result)
+        results.append(result)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to: {args.save}")
+
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            problems = regressions(results, json.load(f), args.tolerance)
+        if problems:
+            print("Regressions against the baseline:")
+            for problem in problems:
+                print(f"  {problem}")
+            sys.exit(1)
+        print("No regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Measure how long the summarizer takes to start.
+
+Each case runs in a fresh interpreter, so module imports are paid every time,
+as they are for a user or a cron job:
+
+    python bench/startup.py               # median and max of 10 runs per case
+    python bench/startup.py --limit 0.5   # exit 1 if any median is slower
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, "summarize.py")
+
+CASES = {
+    "import": [sys.executable, "-c", "import summarize"],
+    "--help": [sys.executable, SCRIPT, "--help"],
+    # An empty input folder: nothing to do, so nothing heavy should load
+    "no-op run": [sys.executable, SCRIPT],
+}
+
+
+def measure(command, runs, workdir):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    env.pop("GEMINI_API_KEY", None)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the summarizer's cold-start time.")
+    parser.add_argument("--runs", type=int, default=10, help="Runs per case (default: %(default)s)")
+    parser.add_argument("--limit", type=float, help="Exit 1 if any case's median exceeds this many seconds")
+    args = parser.parse_args()
+
+    slow = []
+    with tempfile.TemporaryDirectory(prefix="bench-startup-") as workdir:
+        # Warm the bytecode cache once so the runs measure imports, not compilation
+        subprocess.run(CASES["import"], cwd=workdir, env=dict(os.environ, PYTHONPATH=ROOT),
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        for name, command in CASES.items():
+            timings = measure(command, args.runs, workdir)
+            median = statistics.median(timings)
+            print(f"{name:<10} median {median * 1000:6.0f} ms, max {max(timings) * 1000:6.0f} ms")
+            if args.limit is not None and median > args.limit:
+                slow.append(name)
+
+    if slow:
+        print(f"Slower than {args.limit}s: {', '.join(slow)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import hashlib
+import os
+import threading
+import time
+
+import jsonstore
+
+CACHE_DIR = os.path.join(".cache", "summaries")
+INDEX_PATH = os.path.join(".cache", "summary_index.json")
+MAX_CACHE_BYTES = 200 * 1024 * 1024
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(path, chunk_size=HASH_CHUNK_SIZE):
+    """Return the SHA-256 hex digest of a file, read in chunks so large videos stay out of memory."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_text(text):
+    """Return the SHA-256 hex digest of a string (None hashes like the empty string)."""
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def cache_key(video_hash, prompt, model):
+    """Key a summary by the exact video bytes, the full rendered prompt and the model."""
+    digest = hashlib.sha256()
+    for part in (video_hash, prompt, model):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Summaries stored on disk by cache key, evicting least recently used entries past max_bytes."""
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.md")
+
+    def get(self, key):
+        """Return the cached summary for key, or None."""
+        path = self._path(key)
+        try:
+            with open(path, "r") as f:
+                text = f.read()
+        except FileNotFoundError:
+            return None
+        # Mark as recently used for eviction
+        os.utime(path)
+        return text
+
+    def put(self, key, text):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        """Delete the oldest entries until the cache fits in max_bytes."""
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.directory):
+                if not name.endswith(".md"):
+                    continue
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+
+class SummaryIndex(jsonstore.JsonStore):
+    """Records what each summary in the output folder was generated from.
+
+    For every summary path it keeps the hash of the context used and, for
+    summaries made from a transcript, the hash of that transcript, so a
+    re-summarization can skip summaries that are already up to date.
+    """
+
+    def __init__(self, path=INDEX_PATH):
+        super().__init__(path)
+
+    def record(self, summary_path, context_hash, transcript_hash=None):
+        with self._lock:
+            self._load()[summary_path] = {
+                "context": context_hash,
+                "transcript": transcript_hash,
+                "updated_at": time.time(),
+            }
+            self._save()
+
+    def is_current(self, summary_path, context_hash, transcript_hash):
+        """Whether the summary exists and was made with this context (and not from an older transcript)."""
+        with self._lock:
+            entry = self._load().get(summary_path)
+        if entry is None or not os.path.exists(summary_path):
+            return False
+        if entry["context"] != context_hash:
+            return False
+        return entry["transcript"] is None or entry["transcript"] == transcript_hash
@@ -0,0 +1,82 @@
+import hashlib
+import os
+import time
+
+import jsonstore
+
+CACHE_PATH = os.path.join(".cache", "contexts.json")
+# How long Gemini keeps a cached context; storage is billed per hour while it lives
+TTL = 60 * 60
+# Don't start a recording against a cached context that is about to expire
+EXPIRY_MARGIN = 10 * 60
+
+# Gemini refuses to cache less than this many tokens
+MIN_CACHE_TOKENS = {"gemini-2.5-pro": 4096}
+DEFAULT_MIN_CACHE_TOKENS = 1024
+# Rough characters per token, good enough to decide whether caching is possible
+CHARS_PER_TOKEN = 4
+
+
+def context_key(model_name, text):
+    return hashlib.sha256(f"{model_name}\0{text}".encode("utf-8")).hexdigest()
+
+
+def large_enough(model_name, text):
+    """Whether text is likely over the model's minimum size for cached content."""
+    minimum = MIN_CACHE_TOKENS.get(model_name, DEFAULT_MIN_CACHE_TOKENS)
+    return len(text) // CHARS_PER_TOKEN >= minimum
+
+
+class ContextCache(jsonstore.JsonStore):
+    """Server-side cached copies of a context shared by many recordings.
+
+    A cached content object is created once per model and context text and
+    referenced by every generate_content call instead of resending the text.
+    Its name is kept in a small JSON file so later runs with the same
+    context reuse it until it expires.
+
+    create(model_name, text, ttl) must return the new cached content and
+    get(name) an existing one; both are blocking SDK calls.
+    """
+
+    def __init__(self, create, get, path=CACHE_PATH, ttl=TTL):
+        super().__init__(path)
+        self._create = create
+        self._get = get
+        self.ttl = ttl
+        self._live = {}
+
+    def get(self, model_name, text):
+        """Return cached content holding text for model_name, creating it if needed.
+
+        Returns None if the text is too small to cache.
+        """
+        if not large_enough(model_name, text):
+            return None
+        key = context_key(model_name, text)
+        with self._lock:
+            now = time.time()
+            live = self._live.get(key)
+            if live is not None and live[1] - EXPIRY_MARGIN > now:
+                return live[0]
+
+            entry = self._load().get(key)
+            if entry is not None and entry["expires"] - EXPIRY_MARGIN > now:
+                try:
+                    cached = self._get(entry["name"])
+                    print(f"  Reusing cached context: {entry['name']}")
+                    self._live[key] = (cached, entry["expires"])
+                    return cached
+                except Exception as e:
+                    print(f"  Cached context {entry['name']} is no longer available: {e}")
+
+            cached = self._create(model_name, text, self.ttl)
+            expires = now + self.ttl
+            print(f"  Cached context on Gemini: {cached.name}")
+            self._live[key] = (cached, expires)
+            entries = self._load()
+            for stale in [k for k, e in entries.items() if e["expires"] < now]:
+                del entries[stale]
+            entries[key] = {"name": cached.name, "model": model_name, "expires": expires}
+            self._save()
+            return cached
@@ -0,0 +1,111 @@
+import os
+import sqlite3
+import threading
+import time
+
+JOBS_PATH = os.path.join(".cache", "jobs.sqlite3")
+
+# Stages a recording passes through, in order. A job's stage is the last one it completed.
+HASHED = "hashed"
+UPLOADED = "uploaded"
+ACTIVE = "active"
+GENERATED = "generated"
+WRITTEN = "written"
+ARCHIVED = "archived"
+REMOTE_DELETED = "remote-deleted"
+STAGES = (HASHED, UPLOADED, ACTIVE, GENERATED, WRITTEN, ARCHIVED, REMOTE_DELETED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    key TEXT PRIMARY KEY,
+    video_path TEXT NOT NULL,
+    video_hash TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    remote_name TEXT,
+    summary TEXT,
+    output_path TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+def reached(stage, target):
+    """True if a job at `stage` has completed `target` (or a later stage)."""
+    return STAGES.index(stage) >= STAGES.index(target)
+
+
+class JobStore:
+    """Durable record of how far each recording got, so a restarted run can resume it.
+
+    Jobs are keyed by the same key as the result cache (video content, prompt
+    and model), so changing the context or model starts a fresh job.
+    """
+
+    def __init__(self, path=JOBS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = None
+
+    def _connect(self):
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.row_factory = sqlite3.Row
+            self._db.execute(_SCHEMA)
+            self._db.commit()
+        return self._db
+
+    def start(self, key, video_path, video_hash):
+        """Return the job for key as a dict, creating it at HASHED if it doesn't exist.
+
+        A job that already finished is restarted, since its recording is back in the input folder.
+        """
+        with self._lock:
+            db = self._connect()
+            row = db.execute("SELECT * FROM jobs WHERE key = ?", (key,)).fetchone()
+            if row is not None and row["stage"] != REMOTE_DELETED:
+                if row["video_path"] != video_path:
+                    db.execute("UPDATE jobs SET video_path = ? WHERE key = ?", (video_path, key))
+                    db.commit()
+                return dict(row, video_path=video_path)
+
+            now = time.time()
+            db.execute(
+                "INSERT OR REPLACE INTO jobs (key, video_path, video_hash, stage, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, video_path, video_hash, HASHED, now, now),
+            )
+            db.commit()
+            return dict(db.execute("SELECT * FROM jobs WHERE key = ?", (key,)).fetchone())
+
+    def advance(self, key, stage, **fields):
+        """Mark `stage` as completed, updating any of remote_name, summary or output_path."""
+        fields["stage"] = stage
+        fields["error"] = None
+        fields["updated_at"] = time.time()
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            db = self._connect()
+            db.execute(f"UPDATE jobs SET {assignments} WHERE key = ?", (*fields.values(), key))
+            db.commit()
+
+    def fail(self, key, error):
+        """Record the last error for a job without changing its stage."""
+        with self._lock:
+            db = self._connect()
+            db.execute(
+                "UPDATE jobs SET error = ?, updated_at = ? WHERE key = ?",
+                (str(error), time.time(), key),
+            )
+            db.commit()
+
+    def awaiting_remote_delete(self):
+        """Jobs whose recording was archived but whose remote file wasn't deleted yet."""
+        with self._lock:
+            db = self._connect()
+            rows = db.execute(
+                "SELECT * FROM jobs WHERE stage = ? AND remote_name IS NOT NULL", (ARCHIVED,)
+            ).fetchall()
+            return [dict(row) for row in rows]
@@ -0,0 +1,162 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PREFIX = "meeting_summarizer"
+STAGE_BUCKETS = (0.5, 1, 2, 5, 10, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = f"{PREFIX}_{name}"
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, *label_values):
+        with self._lock:
+            self._values[label_values] = value
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def dec(self, *label_values, amount=1):
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=STAGE_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            counts, total, count = self._values.get(label_values, ([0] * len(self.buckets), 0.0, 0))
+            counts = [c + (value <= bound) for c, bound in zip(counts, self.buckets)]
+            self._values[label_values] = (counts, total + value, count + 1)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            for label_values, (counts, total, count) in sorted(self._values.items()):
+                for bound, bucket_count in zip(self.buckets, counts):
+                    labels = _format_labels(self.labels + ("le",), label_values + (_format_value(bound),))
+                    lines.append(f"{self.name}_bucket{labels} {bucket_count}")
+                labels = _format_labels(self.labels + ("le",), label_values + ("+Inf",))
+                lines.append(f"{self.name}_bucket{labels} {count}")
+                labels = _format_labels(self.labels, label_values)
+                lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+                lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+files_processed = Counter("files_processed_total", "Recordings finished, by outcome.", ["status"])
+stage_seconds = Histogram("stage_seconds", "Time spent per recording in each pipeline stage.", ["stage"])
+file_seconds = Histogram("file_seconds", "Total time to process one recording.")
+api_errors = Counter("api_errors_total", "Failed API calls, by operation and error kind.", ["operation", "kind"])
+rate_limited = Counter("rate_limited_total", "API calls rejected with HTTP 429, by operation.", ["operation"])
+retries = Counter("retries_total", "Retried API calls, by operation.", ["operation"])
+model_fallbacks = Counter(
+    "model_fallbacks_total", "Generation requests moved to another model after a 429 or overload.",
+    ["from_model", "to_model"],
+)
+generations = Counter("generations_total", "Successful generation requests, by model.", ["model"])
+bytes_uploaded = Counter("bytes_uploaded_total", "Bytes uploaded to Gemini.")
+upload_resumes = Counter("upload_resumes_total", "Uploads continued from an earlier partial upload.")
+tokens = Counter("tokens_total", "Tokens consumed, by type.", ["type"])
+jobs_in_flight = Gauge("jobs_in_flight", "Recordings currently being processed.")
+queue_depth = Gauge("queue_depth", "Recordings waiting to be processed.")
+
+REGISTRY = (
+    files_processed, stage_seconds, file_seconds, api_errors, rate_limited, retries, model_fallbacks, generations,
+    bytes_uploaded, upload_resumes, tokens, jobs_in_flight, queue_depth,
+)
+
+
+def record_file(file_report):
+    """Feed a finished report.FileReport into the metrics."""
+    files_processed.inc(file_report.status)
+    file_seconds.observe(file_report.seconds or 0.0)
+    for stage, seconds in file_report.stages.items():
+        stage_seconds.observe(seconds, stage)
+    if file_report.bytes_uploaded:
+        bytes_uploaded.inc(amount=file_report.bytes_uploaded)
+    if file_report.upload_resumes:
+        upload_resumes.inc(amount=file_report.upload_resumes)
+    for model_name, count in file_report.models.items():
+        generations.inc(model_name, amount=count)
+    for kind in ("prompt", "cached", "output"):
+        if file_report.tokens[kind]:
+            tokens.inc(kind, amount=file_report.tokens[kind])
+
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep scrapes out of the console output
+        pass
+
+
+def serve(port, host="127.0.0.1"):
+    """Serve /metrics on a background thread; returns the server."""
+    server = ThreadingHTTPServer((host, port), _Handler)
+    thread = threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True)
+    thread.start()
+    return server
@@ -0,0 +1,174 @@
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError
+
+# Rough Gemini-side processing speed, used to guess when a file will be ready
+PROCESSING_BASE_SECONDS = 2.0
+PROCESSING_BYTES_PER_SECOND = 20_000_000
+PROCESSING_SECONDS_PER_VIDEO_SECOND = 0.1
+
+MIN_INTERVAL = 1.0
+MAX_INTERVAL = 30.0
+BACKOFF = 1.5
+MIN_DEADLINE = 300.0
+DEADLINE_FACTOR = 10
+
+# With this many files due at once, one list_files call is cheaper than a get_file each
+BATCH_THRESHOLD = 3
+
+
+def estimate_processing_time(size_bytes, duration=None):
+    """Guess how many seconds Gemini will spend processing a file."""
+    if duration:
+        return PROCESSING_BASE_SECONDS + duration * PROCESSING_SECONDS_PER_VIDEO_SECOND
+    return PROCESSING_BASE_SECONDS + (size_bytes or 0) / PROCESSING_BYTES_PER_SECOND
+
+
+def _resolve(future, result=None, error=None):
+    """Complete a waiter's future unless it was cancelled in the meantime."""
+    try:
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        pass
+
+
+class _Pending:
+    def __init__(self, name, expected, deadline):
+        self.name = name
+        # One per waiter, so a waiter that gives up doesn't cancel the others
+        self.futures = [Future()]
+        self.interval = min(MAX_INTERVAL, max(MIN_INTERVAL, expected / 2))
+        self.next_poll = time.monotonic() + self.interval
+        self.deadline = time.monotonic() + deadline
+        self.polls = 0
+
+    def abandoned(self):
+        return all(future.done() for future in self.futures)
+
+    def resolve(self, result=None, error=None):
+        for future in self.futures:
+            _resolve(future, result, error)
+
+
+class FilePoller:
+    """One background status loop shared by every file waiting on Gemini processing.
+
+    Each file is first checked around half-way through its estimated processing
+    time, then at growing intervals until it leaves PROCESSING or its deadline
+    passes. When several files are due together their states are fetched with a
+    single list_files call.
+    """
+
+    def __init__(self, get_file, list_files=None):
+        self._get_file = get_file
+        self._list_files = list_files
+        self._pending = {}
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def submit(self, video_file, size_bytes=None, duration=None, deadline=None):
+        """Start watching an uploaded file; returns a Future resolved with the final File.
+
+        A file that is already being watched (e.g. an upload shared by identical
+        recordings) gets another future resolved by the same status checks.
+        """
+        if video_file.state.name != "PROCESSING":
+            future = Future()
+            future.set_result(video_file)
+            return future
+
+        with self._cond:
+            existing = self._pending.get(video_file.name)
+            if existing is not None:
+                future = Future()
+                existing.futures.append(future)
+                return future
+
+        size_bytes = size_bytes or getattr(video_file, "size_bytes", 0)
+        expected = estimate_processing_time(size_bytes, duration)
+        if deadline is None:
+            deadline = max(MIN_DEADLINE, expected * DEADLINE_FACTOR)
+        pending = _Pending(video_file.name, expected, deadline)
+
+        with self._cond:
+            self._pending[pending.name] = pending
+            # Restarted if it ever died, so waiting files are never left without a poller
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="file-poller", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return pending.futures[0]
+
+    def wait(self, video_file, size_bytes=None, duration=None, deadline=None):
+        """Block until the file has finished processing and return its latest state."""
+        return self.submit(video_file, size_bytes, duration, deadline).result()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._drop_abandoned()
+                while not self._pending:
+                    self._cond.wait()
+                    self._drop_abandoned()
+                now = time.monotonic()
+                due = [p for p in self._pending.values() if p.next_poll <= now]
+                if not due:
+                    next_poll = min(p.next_poll for p in self._pending.values())
+                    self._cond.wait(timeout=next_poll - now)
+                    continue
+
+            results = self._fetch([p.name for p in due])
+
+            now = time.monotonic()
+            with self._cond:
+                for p in due:
+                    if self._pending.get(p.name) is not p:
+                        continue
+                    if p.abandoned():
+                        # Cancelled by its waiters (e.g. a stage timeout) while being fetched
+                        del self._pending[p.name]
+                        continue
+                    p.polls += 1
+                    result = results.get(p.name)
+                    if isinstance(result, Exception):
+                        del self._pending[p.name]
+                        p.resolve(error=result)
+                    elif result is not None and result.state.name != "PROCESSING":
+                        del self._pending[p.name]
+                        p.resolve(result)
+                    elif now >= p.deadline:
+                        del self._pending[p.name]
+                        p.resolve(error=TimeoutError(
+                            f"{p.name} still processing after {p.polls} status checks"
+                        ))
+                    else:
+                        p.interval = min(MAX_INTERVAL, p.interval * BACKOFF)
+                        p.next_poll = min(now + p.interval, p.deadline)
+
+    def _drop_abandoned(self):
+        """Stop watching files whose waiters cancelled their futures."""
+        for name in [name for name, p in self._pending.items() if p.abandoned()]:
+            del self._pending[name]
+
+    def _fetch(self, names):
+        results = {}
+        if self._list_files is not None and len(names) >= BATCH_THRESHOLD:
+            wanted = set(names)
+            try:
+                for remote in self._list_files():
+                    if remote.name in wanted:
+                        results[remote.name] = remote
+            except Exception:
+                # Fall back to individual lookups below
+                pass
+
+        for name in names:
+            if name not in results:
+                try:
+                    results[name] = self._get_file(name)
+                except Exception as e:
+                    results[name] = e
+        return results
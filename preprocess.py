@@ -0,0 +1,102 @@
+import os
+import shutil
+import subprocess
+
+FFMPEG = "ffmpeg"
+PREPROCESSED_DIR = os.path.join(".cache", "preprocessed")
+
+NONE = "none"
+LOW_RES = "low-res"
+AUDIO = "audio"
+MODES = (NONE, LOW_RES, AUDIO)
+
+# Output extension and ffmpeg arguments for each mode. Gemini samples video at
+# one frame per second, so re-encoding to 1 fps at 480p loses little for
+# meetings; audio-only drops the screen share entirely.
+FFMPEG_ARGS = {
+    LOW_RES: (".mp4", [
+        "-vf", "fps=1,scale=-2:480",
+        "-c:v", "libx264", "-preset", "veryfast", "-crf", "30",
+        "-c:a", "aac", "-b:a", "64k", "-ac", "1",
+    ]),
+    AUDIO: (".aac", [
+        "-vn",
+        "-c:a", "aac", "-b:a", "64k", "-ac", "1",
+    ]),
+}
+
+
+def ffmpeg_available():
+    return shutil.which(FFMPEG) is not None
+
+
+def preprocess(video_path, mode, output_dir=PREPROCESSED_DIR):
+    """Shrink a recording with ffmpeg before upload; returns the path of the file to upload.
+
+    With mode NONE the original path is returned untouched.
+    """
+    if mode == NONE:
+        return video_path
+
+    extension, args = FFMPEG_ARGS[mode]
+    os.makedirs(output_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(video_path))[0]
+    output_path = os.path.join(output_dir, f"{stem}_{mode}{extension}")
+
+    command = [FFMPEG, "-y", "-loglevel", "error", "-i", video_path, *args, output_path]
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed ({mode}): {result.stderr.strip()}")
+    return output_path
+
+
+def describe_reduction(original_path, processed_path):
+    """Describe how much smaller the preprocessed file is, e.g. '1.2 GB -> 18.4 MB (98.5% smaller)'."""
+    original = os.path.getsize(original_path)
+    processed = os.path.getsize(processed_path)
+    saved = 100 * (1 - processed / original) if original else 0
+    return f"{_format_bytes(original)} -> {_format_bytes(processed)} ({saved:.1f}% smaller)"
+
+
+def _format_bytes(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}" if unit != "B" else f"{size} B"
+        size /= 1024
+
+
+def split_segments(video_path, segment_seconds, mode=NONE, output_dir=PREPROCESSED_DIR):
+    """Cut a recording into consecutive segments of about segment_seconds each.
+
+    Segments are stream-copied (cut at the nearest keyframe) unless a
+    preprocessing mode is given, in which case they are re-encoded with it.
+    Returns the segment paths in order.
+    """
+    stem = os.path.splitext(os.path.basename(video_path))[0]
+    segment_dir = os.path.join(output_dir, f"{stem}_segments")
+    # Parts left by an interrupted run (possibly with another segment length) would be merged in
+    shutil.rmtree(segment_dir, ignore_errors=True)
+    os.makedirs(segment_dir)
+
+    if mode == NONE:
+        extension = os.path.splitext(video_path)[1]
+        args = ["-c", "copy"]
+    else:
+        extension, args = FFMPEG_ARGS[mode]
+    pattern = os.path.join(segment_dir, f"{stem}_part%03d{extension}")
+
+    command = [
+        FFMPEG, "-y", "-loglevel", "error", "-i", video_path, *args,
+        "-f", "segment", "-segment_time", str(segment_seconds), "-reset_timestamps", "1",
+        pattern,
+    ]
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        shutil.rmtree(segment_dir, ignore_errors=True)
+        raise RuntimeError(f"ffmpeg failed to split {video_path}: {result.stderr.strip()}")
+
+    return sorted(
+        os.path.join(segment_dir, name)
+        for name in os.listdir(segment_dir)
+        if name.startswith(f"{stem}_part")
+    )
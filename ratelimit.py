@@ -0,0 +1,151 @@
+import asyncio
+import threading
+import time
+
+# Default quotas per model as (requests per minute, tokens per minute).
+# These match the Gemini API free tier; raise them with --rpm/--tpm on paid tiers.
+MODEL_RATE_LIMITS = {
+    "gemini-2.5-pro": (5, 250_000),
+    "gemini-2.5-flash": (10, 250_000),
+    "gemini-2.5-flash-lite": (15, 250_000),
+}
+DEFAULT_RATE_LIMIT = (10, 250_000)
+
+# Upload, get_file and delete_file calls share their own request budget
+FILES_LIMITER = "files"
+FILES_RPM = 120
+
+# Rough Gemini token cost of one second of video (frames + audio)
+TOKENS_PER_VIDEO_SECOND = 300
+# Fallback bitrate used to guess duration when the API doesn't report it
+ASSUMED_BYTES_PER_SECOND = 250_000
+ESTIMATED_OUTPUT_TOKENS = 4_000
+
+
+class TokenBucket:
+    """A bucket of `capacity` units that refills completely every `period` seconds."""
+
+    def __init__(self, capacity, period=60.0):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount, now):
+        """Take `amount` units and return how long the caller must wait before using them.
+
+        The level is allowed to go negative so that waiting callers are served in
+        the order they arrived instead of racing each other for the next refill.
+        """
+        self._refill(now)
+        self.level -= min(amount, self.capacity)
+        if self.level >= 0:
+            return 0.0
+        return -self.level / self.rate
+
+    def available(self, now):
+        """Units that could be taken right now without waiting (negative while callers are queued)."""
+        self._refill(now)
+        return self.level
+
+    def adjust(self, amount, now):
+        """Give back (positive) or charge (negative) units after the fact."""
+        self._refill(now)
+        self.level = min(self.capacity, self.level + amount)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits for one model or API."""
+
+    def __init__(self, rpm, tpm=None):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = TokenBucket(rpm)
+        self._tokens = TokenBucket(tpm) if tpm else None
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=0):
+        """Reserve one request (and `tokens` tokens); returns the seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            wait = self._requests.reserve(1, now)
+            if self._tokens is not None and tokens:
+                wait = max(wait, self._tokens.reserve(tokens, now))
+            return wait
+
+    def headroom(self):
+        """Requests that could start right now without waiting."""
+        with self._lock:
+            return self._requests.available(time.monotonic())
+
+    def acquire(self, tokens=0):
+        """Block until one request (and `tokens` tokens) fits within the quota."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens=0):
+        """Like acquire, but waits without blocking the event loop."""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def record_usage(self, estimated, actual):
+        """Correct an earlier token estimate once the real usage is known."""
+        if self._tokens is None or not actual:
+            return
+        with self._lock:
+            # reserve charged at most one bucketful, so correct relative to what was actually taken
+            charged = min(estimated, self._tokens.capacity)
+            self._tokens.adjust(charged - actual, time.monotonic())
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def configure(name, rpm=None, tpm=None):
+    """Create (or replace) the limiter for `name`, using the known defaults for anything not given."""
+    if name == FILES_LIMITER:
+        default_rpm, default_tpm = FILES_RPM, None
+    else:
+        default_rpm, default_tpm = MODEL_RATE_LIMITS.get(name, DEFAULT_RATE_LIMIT)
+    limiter = RateLimiter(rpm or default_rpm, tpm or default_tpm)
+    with _limiters_lock:
+        _limiters[name] = limiter
+    return limiter
+
+
+def get_limiter(name):
+    """Return the shared limiter for a model name or FILES_LIMITER."""
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+    if limiter is None:
+        limiter = configure(name)
+    return limiter
+
+
+def video_seconds(video_file):
+    """The duration Gemini reported for an uploaded video, or None."""
+    duration = getattr(getattr(video_file, "video_metadata", None), "video_duration", None)
+    if duration is None:
+        return None
+    return duration.total_seconds() if hasattr(duration, "total_seconds") else float(duration)
+
+
+def estimate_tokens(video_file, prompt, duration=None):
+    """Guess the token cost of a generate_content call for a video plus prompt.
+
+    duration is the recording's length in seconds if known better than from
+    the upload itself (e.g. for an audio-only upload).
+    """
+    seconds = duration or video_seconds(video_file)
+    if not seconds:
+        seconds = (getattr(video_file, "size_bytes", 0) or 0) / ASSUMED_BYTES_PER_SECOND
+    return int(seconds * TOKENS_PER_VIDEO_SECOND) + len(prompt) // 4 + ESTIMATED_OUTPUT_TOKENS
@@ -0,0 +1,242 @@
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+
+REPORTS_DIR = "reports"
+
+# Stages in the order they appear in the summary table; any others are listed after
+STAGE_ORDER = (
+    "hash", "preprocess", "upload", "processing", "throttle", "transcription", "generation", "write", "move",
+    "delete",
+)
+
+_current_file = contextvars.ContextVar("current_file_report", default=None)
+_run = None
+
+
+class FileReport:
+    """Timings and counters for one recording.
+
+    Stage times accumulate, so concurrent segments of one recording add up.
+    """
+
+    def __init__(self, video_path):
+        self.video_path = video_path
+        self.started_at = time.time()
+        self._start = time.monotonic()
+        self.seconds = None
+        self.status = None
+        self.error = None
+        self.stages = {}
+        self.bytes_uploaded = 0
+        self.upload_resumes = 0
+        self.models = {}
+        self.retries = {}
+        self.tokens = {"prompt": 0, "cached": 0, "output": 0, "total": 0}
+        self._lock = threading.Lock()
+
+    def add_time(self, stage, seconds):
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    @contextlib.contextmanager
+    def measure(self, stage):
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.monotonic() - start)
+
+    def add_retries(self, operation, count):
+        with self._lock:
+            self.retries[operation] = self.retries.get(operation, 0) + count
+
+    def add_upload(self, size):
+        with self._lock:
+            self.bytes_uploaded += size
+
+    def add_upload_resume(self):
+        with self._lock:
+            self.upload_resumes += 1
+
+    def upload_throughput(self):
+        """Bytes uploaded per second of upload stage time, or None if nothing was uploaded."""
+        seconds = self.stages.get("upload")
+        if not self.bytes_uploaded or not seconds:
+            return None
+        return self.bytes_uploaded / seconds
+
+    def add_model(self, model_name):
+        with self._lock:
+            self.models[model_name] = self.models.get(model_name, 0) + 1
+
+    def add_usage(self, usage):
+        """Add token counts from a response's usage_metadata."""
+        with self._lock:
+            self.tokens["prompt"] += getattr(usage, "prompt_token_count", 0) or 0
+            self.tokens["cached"] += getattr(usage, "cached_content_token_count", 0) or 0
+            self.tokens["output"] += getattr(usage, "candidates_token_count", 0) or 0
+            self.tokens["total"] += getattr(usage, "total_token_count", 0) or 0
+
+    def finish(self, status, error=None):
+        self.status = status
+        self.error = str(error) if error is not None else None
+        self.seconds = time.monotonic() - self._start
+
+    def to_dict(self):
+        return {
+            "file": os.path.basename(self.video_path),
+            "status": self.status,
+            "error": self.error,
+            "started_at": self.started_at,
+            "seconds": round(self.seconds or 0.0, 3),
+            "stages": {stage: round(seconds, 3) for stage, seconds in self.stages.items()},
+            "bytes_uploaded": self.bytes_uploaded,
+            "upload_resumes": self.upload_resumes,
+            "upload_bytes_per_second": round(self.upload_throughput() or 0.0),
+            "retries": self.retries,
+            "tokens": self.tokens,
+            "models": self.models,
+        }
+
+
+class RunReport:
+    """Collects FileReports for a run and appends each one to a JSON-lines file as it finishes."""
+
+    def __init__(self, path):
+        self.path = path
+        self.files = []
+        self._lock = threading.Lock()
+
+    def add(self, file_report):
+        with self._lock:
+            self.files.append(file_report)
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(json.dumps(file_report.to_dict()) + "\n")
+
+    def summary_lines(self):
+        """A per-stage table of count, p50, p95 and total seconds, followed by run totals."""
+        with self._lock:
+            files = list(self.files)
+        if not files:
+            return []
+
+        by_stage = {}
+        for file_report in files:
+            for stage, seconds in file_report.stages.items():
+                by_stage.setdefault(stage, []).append(seconds)
+        stages = [s for s in STAGE_ORDER if s in by_stage]
+        stages += sorted(s for s in by_stage if s not in STAGE_ORDER)
+
+        lines = [f"{'Stage':<14}{'Files':>7}{'p50 (s)':>10}{'p95 (s)':>10}{'Total (s)':>11}"]
+        for stage in stages:
+            values = sorted(by_stage[stage])
+            lines.append(
+                f"{stage:<14}{len(values):>7}{percentile(values, 50):>10.1f}"
+                f"{percentile(values, 95):>10.1f}{sum(values):>11.1f}"
+            )
+
+        statuses = {}
+        for file_report in files:
+            statuses[file_report.status] = statuses.get(file_report.status, 0) + 1
+        uploaded = sum(f.bytes_uploaded for f in files)
+        upload_seconds = sum(f.stages.get("upload", 0.0) for f in files if f.bytes_uploaded)
+        resumes = sum(f.upload_resumes for f in files)
+        tokens = sum(f.tokens["total"] for f in files)
+        retries = sum(sum(f.retries.values()) for f in files)
+        throughput = f" at {uploaded / (1024 * 1024) / upload_seconds:.1f} MB/s" if upload_seconds else ""
+        lines.append(
+            ", ".join(f"{count} {status}" for status, count in sorted(statuses.items()))
+            + f"; {uploaded / (1024 * 1024):.1f} MB uploaded{throughput} ({resumes} resumed), "
+            + f"{tokens} tokens, {retries} retries"
+        )
+        lines.append(f"Report written to: {self.path}")
+        return lines
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-pct * len(sorted_values) // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def start_run(path=None):
+    """Begin a run report; by default written to REPORTS_DIR/run-<timestamp>.jsonl."""
+    global _run
+    if path is None:
+        path = os.path.join(REPORTS_DIR, time.strftime("run-%Y%m%d-%H%M%S.jsonl"))
+    _run = RunReport(path)
+    return _run
+
+
+def begin_file(video_path):
+    """Start a FileReport and make it current for the calling task (and threads it starts)."""
+    file_report = FileReport(video_path)
+    _current_file.set(file_report)
+    return file_report
+
+
+def current_file():
+    """The FileReport of the recording being processed in this context, or None."""
+    return _current_file.get()
+
+
+def finish_file(file_report, status, error=None):
+    file_report.finish(status, error)
+    if _run is not None:
+        _run.add(file_report)
+
+
+# Helpers that record into the current FileReport, doing nothing outside of one
+
+@contextlib.contextmanager
+def timed(stage):
+    file_report = current_file()
+    if file_report is None:
+        yield
+        return
+    with file_report.measure(stage):
+        yield
+
+
+def note_time(stage, seconds):
+    file_report = current_file()
+    if file_report is not None and seconds:
+        file_report.add_time(stage, seconds)
+
+
+def note_retries(operation, count):
+    file_report = current_file()
+    if file_report is not None and count:
+        file_report.add_retries(operation, count)
+
+
+def note_upload(size):
+    file_report = current_file()
+    if file_report is not None:
+        file_report.add_upload(size)
+
+
+def note_upload_resume():
+    file_report = current_file()
+    if file_report is not None:
+        file_report.add_upload_resume()
+
+
+def note_model(model_name):
+    """Count a successful generation request against the model that served it."""
+    file_report = current_file()
+    if file_report is not None:
+        file_report.add_model(model_name)
+
+
+def note_usage(usage):
+    file_report = current_file()
+    if file_report is not None:
+        file_report.add_usage(usage)
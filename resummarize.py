@@ -0,0 +1,113 @@
+import argparse
+import asyncio
+import glob
+import os
+
+import report
+import summarize
+
+
+def recordings_without_transcripts():
+    """Archived recordings that have no saved transcript, so can't be re-summarized cheaply."""
+    missing = []
+    for video_path in sorted(glob.glob(os.path.join(summarize.PROCESSED_DIR, "*.mov"))):
+        if not os.path.exists(summarize.transcript_path(video_path)):
+            missing.append(os.path.basename(video_path))
+    return missing
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Update the summaries of processed recordings after the context file changed, "
+                    "using their saved transcripts instead of the videos"
+    )
+    parser.add_argument(
+        "--context", "-c",
+        type=str,
+        help="Path to the (updated) markdown context file; without it, summaries are updated for no context"
+    )
+    parser.add_argument(
+        "--workers", "-w",
+        type=int,
+        default=4,
+        help="Number of summaries to update concurrently (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Write each summary from scratch instead of revising the parts affected by the context"
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Also update summaries that were already made with this context"
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Write structured summaries with a JSON file next to each one (always written from scratch)"
+    )
+    parser.add_argument(
+        "--model",
+        help="Use this Gemini model for every summary (default: pick one per transcript by length)"
+    )
+    parser.add_argument(
+        "--no-fallback",
+        action="store_true",
+        help="Don't switch to another model when the chosen one is rate limited or overloaded"
+    )
+    parser.add_argument("--rpm", type=int, help="Requests per minute allowed per model")
+    parser.add_argument("--tpm", type=int, help="Tokens per minute allowed per model")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore cached summaries and always generate again"
+    )
+    parser.add_argument(
+        "--report",
+        type=str,
+        help="Path of the JSON-lines run report (default: reports/run-<timestamp>.jsonl)"
+    )
+    args = parser.parse_args()
+
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    transcripts = sorted(glob.glob(os.path.join(summarize.TRANSCRIPTS_DIR, "*_transcript.md")))
+    missing = recordings_without_transcripts()
+    if missing:
+        print(f"{len(missing)} processed recording(s) have no transcript and are skipped "
+              f"(summarize them with --transcript to make them re-summarizable):")
+        for name in missing:
+            print(f"  {name}")
+    if not transcripts:
+        print("No transcripts found in 'transcripts' folder.")
+        return
+    summarize.require_api_key()
+
+    summarize.configure_rate_limits(args.model, not args.no_fallback, args.rpm, args.tpm)
+
+    context = None
+    if args.context:
+        print(f"Loading context from: {args.context}")
+        context = summarize.load_context(args.context)
+
+    run_report = report.start_run(args.report)
+    print(f"Checking {len(transcripts)} summaries against the context...")
+    asyncio.run(summarize.process_files_async(
+        transcripts, context, args.workers,
+        job=summarize.summarize_transcript_async,
+        use_cache=not args.no_cache,
+        model=args.model,
+        fallback=not args.no_fallback,
+        skip_unchanged=not args.force,
+        revise=not args.full,
+        structured=args.json,
+    ))
+
+    summarize.print_run_summary(run_report)
+    print("All done!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+import asyncio
+import random
+import re
+import threading
+import time
+
+import metrics
+import report
+
+TRANSIENT = "transient"
+PERMANENT = "permanent"
+
+# HTTP status codes worth retrying: rate limiting, server errors and timeouts
+TRANSIENT_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+# Error class names (from requests, urllib3, httpx, grpc) that mean the network
+# dropped rather than the request being rejected
+TRANSIENT_ERROR_NAMES = {
+    "ConnectionError", "ConnectTimeout", "ReadTimeout", "Timeout", "TimeoutException",
+    "RemoteDisconnected", "ProtocolError", "ServiceUnavailable", "DeadlineExceeded",
+    "ResourceExhausted", "TooManyRequests", "InternalServerError", "GatewayTimeout",
+}
+
+_RETRY_IN_PATTERN = re.compile(r"retry (?:in|after) ([\d.]+)\s*s", re.IGNORECASE)
+_RETRY_DELAY_PATTERN = re.compile(r"retry_?delay\W+([\d.]+)s", re.IGNORECASE)
+
+
+def _response(error):
+    # requests/httpx errors use .response, googleapiclient's HttpError (uploads) uses .resp
+    return getattr(error, "response", None) or getattr(error, "resp", None)
+
+
+def status_code(error):
+    """Return the HTTP status code carried by an SDK/HTTP error, if any."""
+    code = getattr(error, "code", None)
+    if isinstance(code, int):
+        return code
+    response = _response(error)
+    code = getattr(response, "status_code", None) or getattr(response, "status", None)
+    return code if isinstance(code, int) else None
+
+
+def classify(error):
+    """Decide whether an error is worth retrying (TRANSIENT) or not (PERMANENT)."""
+    code = status_code(error)
+    if code is not None:
+        return TRANSIENT if code in TRANSIENT_STATUS_CODES else PERMANENT
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return TRANSIENT
+    if any(cls.__name__ in TRANSIENT_ERROR_NAMES for cls in type(error).__mro__):
+        return TRANSIENT
+    return PERMANENT
+
+
+def retry_after(error):
+    """Return the server-suggested delay in seconds for an error, or None."""
+    response = _response(error)
+    headers = getattr(response, "headers", None) or (response if isinstance(response, dict) else None)
+    if headers is None:
+        # urllib's HTTPError (resumable uploads, batch API) carries the headers itself
+        headers = getattr(error, "headers", None) or {}
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    if value:
+        try:
+            return float(value)
+        except ValueError:
+            pass
+
+    # google.rpc.RetryInfo attached to gRPC/REST errors
+    for detail in getattr(error, "details", None) or []:
+        delay = getattr(detail, "retry_delay", None)
+        if delay is not None:
+            if hasattr(delay, "total_seconds"):
+                return delay.total_seconds()
+            return getattr(delay, "seconds", 0) + getattr(delay, "nanos", 0) / 1e9
+
+    message = str(error)
+    match = _RETRY_IN_PATTERN.search(message) or _RETRY_DELAY_PATTERN.search(message)
+    if match:
+        return float(match.group(1))
+    return None
+
+
+class RetryStats:
+    """Thread-safe per-operation counters for calls, retries, failures and latency."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.operations = {}
+
+    def record(self, operation, attempts, elapsed, succeeded):
+        report.note_retries(operation, attempts - 1)
+        with self._lock:
+            stats = self.operations.setdefault(
+                operation, {"calls": 0, "retries": 0, "failures": 0, "seconds": 0.0}
+            )
+            stats["calls"] += 1
+            stats["retries"] += attempts - 1
+            stats["seconds"] += elapsed
+            if not succeeded:
+                stats["failures"] += 1
+
+    def report(self):
+        """Return one line per operation describing its retries and average latency."""
+        with self._lock:
+            lines = []
+            for operation, stats in sorted(self.operations.items()):
+                average = stats["seconds"] / stats["calls"]
+                lines.append(
+                    f"{operation}: {stats['calls']} calls, {stats['retries']} retries, "
+                    f"{stats['failures']} failed, {average:.1f}s avg"
+                )
+            return lines
+
+
+stats = RetryStats()
+
+
+class RetryPolicy:
+    """Capped exponential backoff with full jitter for transient errors."""
+
+    def __init__(self, max_attempts=4, base_delay=2.0, max_delay=60.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt, error=None):
+        """Seconds to wait before retry number `attempt` (starting at 1)."""
+        hint = retry_after(error) if error is not None else None
+        if hint is not None:
+            # Honour the server's hint, with a little jitter so waiting callers spread out
+            return min(hint, self.max_delay) + random.uniform(0, self.base_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def _failed(self, operation, attempt, start, error):
+        """Report a failed attempt; returns the seconds to wait before retrying, or re-raises."""
+        kind = classify(error)
+        print(f"  {operation.capitalize()} attempt {attempt} failed ({kind}): {error}")
+        metrics.api_errors.inc(operation, kind)
+        if status_code(error) == 429:
+            metrics.rate_limited.inc(operation)
+        if kind == PERMANENT or attempt == self.max_attempts:
+            stats.record(operation, attempt, time.monotonic() - start, False)
+            raise error
+        metrics.retries.inc(operation)
+        wait = self.delay(attempt, error)
+        print(f"  Retrying in {wait:.1f} seconds...")
+        return wait
+
+    def call(self, operation, fn, *args, **kwargs):
+        """Call fn(*args, **kwargs), retrying transient failures according to this policy."""
+        start = time.monotonic()
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                time.sleep(self._failed(operation, attempt, start, e))
+            else:
+                stats.record(operation, attempt, time.monotonic() - start, True)
+                return result
+
+    async def call_async(self, operation, fn, *args, **kwargs):
+        """Await fn(*args, **kwargs), retrying transient failures according to this policy."""
+        start = time.monotonic()
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as e:
+                await asyncio.sleep(self._failed(operation, attempt, start, e))
+            else:
+                stats.record(operation, attempt, time.monotonic() - start, True)
+                return result
+
+
+UPLOAD_POLICY = RetryPolicy(max_attempts=5, base_delay=2.0, max_delay=60.0)
+POLL_POLICY = RetryPolicy(max_attempts=5, base_delay=1.0, max_delay=30.0)
+GENERATE_POLICY = RetryPolicy(max_attempts=4, base_delay=10.0, max_delay=120.0)
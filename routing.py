@@ -0,0 +1,60 @@
+import ratelimit
+import retry
+
+# Model for each recording length: the first route whose limit (in seconds of
+# video) covers the recording is used; None means no limit
+ROUTES = (
+    (20 * 60, "gemini-2.5-flash-lite"),
+    (90 * 60, "gemini-2.5-flash"),
+    (None, "gemini-2.5-pro"),
+)
+# Models to fall back to, in order, when a model is rate limited or overloaded
+FALLBACKS = {
+    "gemini-2.5-pro": ("gemini-2.5-flash",),
+    "gemini-2.5-flash": ("gemini-2.5-flash-lite",),
+    "gemini-2.5-flash-lite": ("gemini-2.5-flash",),
+}
+MODELS = tuple(model for _, model in ROUTES)
+
+# Recorded in place of a model name (e.g. in cache keys) when the model is picked per recording
+AUTO = "auto"
+
+# HTTP statuses meaning the model is out of quota or overloaded rather than the request being bad
+FALLBACK_STATUS_CODES = {429, 503}
+FALLBACK_ERROR_NAMES = {"ResourceExhausted", "TooManyRequests", "ServiceUnavailable"}
+
+
+def route(duration=None, size_bytes=None):
+    """The model suited to a recording of this duration (seconds) or, failing that, size."""
+    if not duration:
+        duration = (size_bytes or 0) / ratelimit.ASSUMED_BYTES_PER_SECOND
+    for limit, model in ROUTES:
+        if limit is None or duration <= limit:
+            return model
+    return ROUTES[-1][1]
+
+
+def candidates(duration=None, size_bytes=None, pinned=None, fallback=True):
+    """Model names to try for a recording, best first.
+
+    The first is the pinned model or the routed one. If it has no request
+    quota left right now and its first fallback does, the two swap places so
+    the request goes out immediately instead of waiting for the quota.
+    """
+    primary = pinned or route(duration, size_bytes)
+    if not fallback:
+        return [primary]
+    models = [primary] + [model for model in FALLBACKS.get(primary, ()) if model != primary]
+    if len(models) > 1:
+        primary_headroom = ratelimit.get_limiter(models[0]).headroom()
+        if primary_headroom < 1 and ratelimit.get_limiter(models[1]).headroom() >= 1:
+            models[0], models[1] = models[1], models[0]
+    return models
+
+
+def should_fall_back(error):
+    """Whether an error means trying another model may succeed where this one didn't."""
+    code = retry.status_code(error)
+    if code is not None:
+        return code in FALLBACK_STATUS_CODES
+    return any(cls.__name__ in FALLBACK_ERROR_NAMES for cls in type(error).__mro__)
@@ -1,29 +1,91 @@
 import os
 import time
+import asyncio
+import contextlib
+import contextvars
+import functools
 import glob
+import json
+import re
 import shutil
+import signal
 import argparse
-from dotenv import load_dotenv
-import google.generativeai as genai
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-# Load environment variables
-load_dotenv()
+import batch
+import cache
+import cached_context
+import jobs
+import metrics
+import poller
+import preprocess
+import ratelimit
+import report
+import retry
+import routing
+import summary_schema
+import uploads
+import watch
 
-API_KEY = os.getenv("GEMINI_API_KEY")
+class MissingAPIKeyError(RuntimeError):
+    pass
 
-if not API_KEY:
-    print("Error: GEMINI_API_KEY not found in .env file.")
-    print("Please copy .env.example to .env and add your API key.")
-    exit(1)
+_setup_lock = threading.Lock()
+_api_key = None
 
-genai.configure(api_key=API_KEY)
+def api_key():
+    """The Gemini API key from the environment or .env, loaded on first use."""
+    global _api_key
+    with _setup_lock:
+        if _api_key is None:
+            from dotenv import load_dotenv
+            load_dotenv()
+            _api_key = os.getenv("GEMINI_API_KEY")
+            if not _api_key:
+                raise MissingAPIKeyError("GEMINI_API_KEY not found in .env file.")
+        return _api_key
+
+class _LazyGenai:
+    """Stands in for google.generativeai, importing and configuring it on first use.
+
+    The SDK takes about a second to import, which --help, runs with nothing
+    to do and importing this module as a library shouldn't pay for.
+
+    The SDK's service clients (each holding one gRPC channel, multiplexed
+    over HTTP/2 and shared by every thread) are created right away under the
+    lock, since the SDK caches them without locking and concurrent first
+    calls from worker threads could otherwise each open their own.
+    """
+
+    def __init__(self):
+        self._module = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        if self._module is None:
+            key = api_key()
+            with self._lock:
+                if self._module is None:
+                    import google.generativeai
+                    from google.generativeai import client
+                    google.generativeai.configure(api_key=key, transport="grpc")
+                    client.get_default_generative_client()
+                    client.get_default_file_client()
+                    client.get_default_cache_client()
+                    self._module = google.generativeai
+        return getattr(self._module, name)
+
+genai = _LazyGenai()
 
 INPUT_DIR = "input"
 OUTPUT_DIR = "output"
 PROCESSED_DIR = "processed"
+TRANSCRIPTS_DIR = "transcripts"
 
-# Model configuration
-MODEL = "gemini-2.5-flash"
+# Model configuration: by default the model is picked per recording (see routing.py);
+# --model pins one instead
+MODEL = None
 
 SUMMARY_PROMPT = """Analyze this meeting recording and create a comprehensive, well-structured summary in Markdown format.
 
@@ -63,90 +125,1020 @@ What happens after this meeting? Any follow-up meetings scheduled?
 ---
 Be thorough and capture nuances. Use bullet points for clarity. If information for a section is not available, note "Not discussed" rather than omitting the section."""
 
-# Create directories if they don't exist
-os.makedirs(INPUT_DIR, exist_ok=True)
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-os.makedirs(PROCESSED_DIR, exist_ok=True)
+# Used instead of SUMMARY_PROMPT for structured output (--json); the response follows
+# summary_schema.SCHEMA and the markdown is rendered from it locally
+STRUCTURED_PROMPT = """Analyze this meeting recording and summarize it as JSON matching the response schema.
 
-def summarize_video(video_path, context=None):
-    print(f"Processing: {video_path}")
+- title: the meeting title or topic (infer from context); date and duration if discernible
+- participants: every attendee, with their role if mentioned
+- executive_summary: 2-3 paragraphs on what was discussed and accomplished
+- discussion_points: each major topic, with context, concerns raised and conclusions reached
+- decisions: each decision, who made or approved it, and any conditions or caveats
+- action_items: each task with its owner, deadline if mentioned, and priority (High/Medium/Low)
+- open_questions: unresolved questions and topics deferred for later discussion
+- next_steps: what happens after this meeting, including any follow-up meetings
+
+Be thorough and capture nuances. Use null for unknown values and empty lists for sections that were not discussed."""
 
+def summary_instructions(structured=False):
+    return STRUCTURED_PROMPT if structured else SUMMARY_PROMPT
+
+def summary_generation_config(structured=False):
+    return summary_schema.generation_config() if structured else None
+
+def check_summary(text, structured=False):
+    """Return a generated summary, raising ValueError if it can't be written (structured: invalid JSON).
+
+    Called before a response is cached or stored, so a truncated structured
+    response fails its generation instead of being reused by every later run.
+    """
+    if structured:
+        summary_schema.parse(text)
+    return text
+
+def _stored_summary(text, structured=False):
+    """A cached or resumed summary, or None if it can't be written and must be generated again."""
+    if text is None:
+        return None
     try:
-        # Upload the file
-        print("  Uploading to Gemini...")
-        video_file = None
-        for attempt in range(3):
-            try:
-                video_file = genai.upload_file(path=video_path)
-                break
-            except Exception as e:
-                print(f"  Upload attempt {attempt + 1} failed: {e}")
-                if attempt == 2:
-                    raise
-                time.sleep(5)
-
-        # Wait for processing
-        print("  Waiting for Gemini to process the video...")
-        while video_file.state.name == "PROCESSING":
-            time.sleep(10)
-            video_file = genai.get_file(video_file.name)
-
-        if video_file.state.name == "FAILED":
-            print("  Error: Video processing failed.")
+        return check_summary(text, structured)
+    except ValueError as e:
+        print(f"  Discarding stored summary: {e}")
+        return None
+
+# Long recordings can be split into segments that are summarized in parallel
+# and then merged (see --segment-minutes)
+MAX_SEGMENT_WORKERS = 4
+
+# Default per-stage timeouts in seconds for summarize_video_async (None = no limit).
+# Waiting for Gemini processing is also bounded by the poller's own deadline.
+STAGE_TIMEOUTS = {
+    "hash": 600,
+    "preprocess": 3600,
+    "upload": 3600,
+    "processing": None,
+    "generation": 1800,
+    "save": 600,
+}
+
+TRANSCRIPT_PROMPT = """Transcribe this meeting recording in full.
+
+Write one line per utterance in the form `[HH:MM:SS] Speaker: text`, where the timestamp is when the utterance starts. Use each speaker's name when it is said or shown in the recording (or given in the context above); otherwise label them consistently as Speaker 1, Speaker 2 and so on. Transcribe what is said without summarizing or correcting it, and note long silences or inaudible passages in square brackets. Output only the transcript."""
+
+_TRANSCRIPT_HEADER = re.compile(r"<!-- source: (.+) sha256: (\S+) -->")
+_TRANSCRIPT_TIMESTAMP = re.compile(r"^\[(\d+):(\d{2}):(\d{2})\]", re.MULTILINE)
+
+# Used to update an existing summary from its transcript after the context changed
+REVISE_PROMPT = """The summary below was written from this transcript with different context than the context now provided (if any). Update it to match the current context: correct names, roles, project and product names, and any statements that depend on them. Keep every section, sentence and formatting that the change doesn't affect exactly as it is. Output the complete updated summary in Markdown, without commentary.
+
+## Previous Summary
+
+{summary}"""
+
+# Put in front of the summary prompt when summarizing from a saved transcript instead of the video
+TRANSCRIPT_SUMMARY_PREFIX = """The recording itself is not attached. Below is its full timestamped, speaker-labeled transcript; treat it as the recording.
+
+{transcript}
+
+---
+
+"""
+
+SEGMENT_PROMPT = """This video is part {index} of {count} of a longer meeting recording, covering roughly {start} to {end} of the meeting.
+
+Take thorough notes on this part only, in Markdown. They will later be merged with the notes from the other parts into one summary, so do not write an overall summary. Capture:
+- Participants who speak or are mentioned (with roles if stated)
+- Each topic discussed, with context, concerns raised and conclusions
+- Decisions made, who made or approved them, and any conditions
+- Action items with owner, deadline and priority if mentioned
+- Open questions and deferred topics
+- Any follow-up meetings or next steps mentioned
+
+Mention approximate timestamps for important moments."""
+
+MERGE_PROMPT = """Below are notes taken on consecutive parts of a single meeting recording, in order. Combine them into one summary of the whole meeting: remove duplication between parts, keep the chronology of the discussion, and consolidate decisions and action items that span several parts.
+
+{parts}
+
+---
+
+{prompt}"""
+
+def _get_file(name):
+    ratelimit.get_limiter(ratelimit.FILES_LIMITER).acquire()
+    return genai.get_file(name)
+
+def _delete_file(name):
+    ratelimit.get_limiter(ratelimit.FILES_LIMITER).acquire()
+    genai.delete_file(name)
+
+def _poll_file(name):
+    return retry.POLL_POLICY.call("poll", _get_file, name)
+
+def _list_files():
+    ratelimit.get_limiter(ratelimit.FILES_LIMITER).acquire()
+    return list(genai.list_files())
+
+def _create_cached_context(model_name, text, ttl):
+    return retry.POLL_POLICY.call(
+        "cache context", genai.caching.CachedContent.create,
+        model=model_name, display_name="meeting-summarizer-context", contents=[text], ttl=ttl,
+    )
+
+def _get_cached_context(name):
+    return genai.caching.CachedContent.get(name)
+
+# Worker threads for the blocking SDK, file and ffmpeg calls, kept apart from the
+# event loop's default executor so a host application's stays as it configured it
+_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="summarizer")
+_executor_size = 32
+_executor_lock = threading.Lock()
+
+def _use_workers(workers):
+    """Make sure each of `workers` in-flight jobs can get a worker thread, growing the pool if needed."""
+    global _executor, _executor_size
+    size = max(32, workers * 2)
+    with _executor_lock:
+        if size <= _executor_size:
             return
+        # Calls already running on the old pool finish there
+        _executor.shutdown(wait=False)
+        _executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="summarizer")
+        _executor_size = size
 
-        # Build prompt with optional context
-        base_name = os.path.basename(video_path)
-        prompt_with_filename = f"The filename of this recording is: '{base_name}'. Please use the date and name from the filename for the Meeting Overview if applicable.\n\n{SUMMARY_PROMPT}"
-        prompt = prompt_with_filename
-        if context:
-            prompt = f"""## Additional Context
+async def _to_thread(fn, *args, **kwargs):
+    """asyncio.to_thread on this module's worker threads, carrying over context variables."""
+    call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(_executor, call)
+
+async def _files_api(fn, *args, **kwargs):
+    # The Files API client is blocking, so calls run on worker threads while the
+    # rate limiter waits on the event loop
+    report.note_time("throttle", await ratelimit.get_limiter(ratelimit.FILES_LIMITER).acquire_async())
+    return await _to_thread(fn, *args, **kwargs)
+
+# Shared by every in-flight upload so concurrent files are polled from one loop
+file_poller = poller.FilePoller(_poll_file, _list_files)
+
+result_cache = cache.ResultCache()
+summary_index = cache.SummaryIndex()
+upload_registry = uploads.UploadRegistry()
+upload_sessions = uploads.UploadSessions()
+job_store = jobs.JobStore()
+batch_store = batch.BatchStore()
+context_cache = cached_context.ContextCache(_create_cached_context, _get_cached_context)
+
+async def _stage(name, awaitable, timeouts):
+    """Await one stage of the pipeline, enforcing its timeout from timeouts (None = no limit)."""
+    timeout = timeouts.get(name)
+    if timeout is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, timeout)
+    except asyncio.TimeoutError:
+        raise TimeoutError(f"{name} stage timed out after {timeout} seconds") from None
+
+def _model_limiter(model):
+    return ratelimit.get_limiter(model.model_name.split("/")[-1])
+
+def _stream_to_file(model, contents, stream_path):
+    start = time.monotonic()
+    response = model.generate_content(contents, stream=True, request_options={"timeout": 1200})
+
+    # A retried attempt starts the file over
+    with open(stream_path, "w") as f:
+        for chunk in response:
+            if f.tell() == 0:
+                print(f"  First output after {time.monotonic() - start:.1f}s, streaming to {stream_path}")
+            f.write(chunk.text)
+            f.flush()
+        print(f"  Streamed {f.tell()} characters in {time.monotonic() - start:.1f}s")
+    return response
+
+async def _generate(model, contents, estimated_tokens, stream_path=None, generation_config=None):
+    report.note_time("throttle", await _model_limiter(model).acquire_async(estimated_tokens))
+    if stream_path:
+        return await _to_thread(_stream_to_file, model, contents, stream_path)
+    return await _to_thread(
+        model.generate_content, contents, generation_config=generation_config, request_options={"timeout": 1200}
+    )
+
+async def _generate_with_fallback(model_names, context, render, video_file, stream_path, generation_config,
+                                  duration):
+    """One generation attempt, moving on to the next model when one is rate limited or overloaded."""
+    for index, model_name in enumerate(model_names):
+        model, inline_context = await _to_thread(model_for_context, model_name, context)
+        prompt = render(inline_context)
+        contents = [video_file, prompt] if video_file is not None else [prompt]
+        estimated_tokens = ratelimit.estimate_tokens(video_file, prompt, duration)
+        try:
+            response = await _generate(model, contents, estimated_tokens, stream_path, generation_config)
+        except Exception as e:
+            if index + 1 == len(model_names) or not routing.should_fall_back(e):
+                raise
+            print(f"  {model_name} unavailable ({e}), falling back to {model_names[index + 1]}")
+            metrics.api_errors.inc("generation", retry.classify(e))
+            if retry.status_code(e) == 429:
+                metrics.rate_limited.inc("generation")
+            metrics.model_fallbacks.inc(model_name, model_names[index + 1])
+            continue
+
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None:
+            _model_limiter(model).record_usage(estimated_tokens, usage.total_token_count)
+            report.note_usage(usage)
+        report.note_model(model_name)
+        return response
+
+async def generate_text(model_names, context, render, video_file=None, stream_path=None, stage="generation",
+                        generation_config=None, duration=None):
+    """Generate a response (against video_file when given) and return its text.
+
+    render(inline_context) returns the prompt, where inline_context is the
+    context to include in it, or None when it is cached on Gemini for the
+    model being used. model_names are tried in order, moving on as soon as one
+    is rate limited or overloaded; only when all of them fail is the attempt
+    retried with backoff.
+    With stream_path, the response is streamed and appended to that file as it arrives.
+    generation_config is passed to generate_content (e.g. a response schema).
+    duration is the recording's length in seconds, for estimating its token cost.
+    The time taken is reported under stage.
+    """
+    with report.timed(stage):
+        response = await retry.GENERATE_POLICY.call_async(
+            "generation", _generate_with_fallback, model_names, context, render, video_file, stream_path,
+            generation_config, duration,
+        )
+    return response.text
+
+def recording_seconds(video_file, source_path=None):
+    """A recording's length in seconds: as reported by Gemini for its upload, or guessed from its size.
+
+    The guess uses the original recording at source_path when given, since a
+    preprocessed upload (audio only, for one) is far smaller per second than
+    the recordings the bytes-per-second assumption is based on.
+    """
+    seconds = ratelimit.video_seconds(video_file)
+    if seconds:
+        return seconds
+    size_bytes = getattr(video_file, "size_bytes", 0)
+    if source_path is not None and os.path.exists(source_path):
+        size_bytes = os.path.getsize(source_path)
+    return (size_bytes or 0) / ratelimit.ASSUMED_BYTES_PER_SECOND
+
+def models_for(video_file=None, duration=None, model=MODEL, fallback=True):
+    """Model names to try for a video, best first: the pinned model, or one routed by length and quota."""
+    if duration is None and video_file is not None:
+        duration = ratelimit.video_seconds(video_file)
+    size_bytes = getattr(video_file, "size_bytes", None)
+    return routing.candidates(duration, size_bytes, pinned=model, fallback=fallback)
+
+def context_block(context):
+    """The part of the prompt that presents the user's context; shared by every recording."""
+    return f"""## Additional Context
 The following context has been provided to help with the summary:
 
 {context}
 
 ---
 
-{prompt_with_filename}"""
+"""
+
+def build_prompt(video_path, context=None, instructions=SUMMARY_PROMPT):
+    """Render the full prompt for a recording: optional context, filename hint and instructions."""
+    base_name = os.path.basename(video_path)
+    prompt_with_filename = f"The filename of this recording is: '{base_name}'. Please use the date and name from the filename for the Meeting Overview if applicable.\n\n{instructions}"
+    if not context:
+        return prompt_with_filename
+    return context_block(context) + prompt_with_filename
+
+_models = {}
+_models_lock = threading.Lock()
+
+def _model(model_name, cached=None):
+    """The shared GenerativeModel for a model name (and cached context), created on first use."""
+    key = (model_name, cached.name if cached is not None else None)
+    with _models_lock:
+        model = _models.get(key)
+        if model is None:
+            if cached is not None:
+                model = genai.GenerativeModel.from_cached_content(cached)
+            else:
+                model = genai.GenerativeModel(model_name=model_name)
+            _models[key] = model
+        return model
+
+def model_for_context(model_name, context):
+    """Return (model, inline_context) for summarizing with the given context.
+
+    A large context is cached on Gemini once per model and the model
+    references it, so inline_context is None; otherwise the context is sent
+    inline with every prompt. Models are shared by every recording.
+    """
+    if context:
+        try:
+            cached = context_cache.get(model_name, context_block(context))
+        except Exception as e:
+            print(f"  Could not cache the context on Gemini, sending it inline: {e}")
+            cached = None
+        if cached is not None:
+            return _model(model_name, cached), None
+    return _model(model_name), context
+
+async def upload_video(video_path, video_hash, preprocess_mode=preprocess.NONE, source_path=None,
+                       timeouts=STAGE_TIMEOUTS):
+    """Return the remote file for a video, reusing a live earlier upload of the same bytes.
+
+    video_hash identifies the content to upload, so it must already account for
+    preprocess_mode. Preprocessing only runs when a fresh upload is needed.
+    source_path is the recording in INPUT_DIR the upload belongs to, if that
+    isn't video_path itself (e.g. for segments).
+    """
+    name = upload_registry.lookup(video_hash)
+    if name is not None:
+        try:
+            video_file = await _to_thread(_poll_file, name)
+            if video_file.state.name in ("ACTIVE", "PROCESSING"):
+                print(f"  Reusing earlier upload: {name}")
+                return video_file
+        except Exception as e:
+            print(f"  Earlier upload {name} is no longer available: {e}")
+        upload_registry.forget(video_hash)
+
+    upload_path = video_path
+    if preprocess_mode != preprocess.NONE:
+        print(f"  Preprocessing with ffmpeg ({preprocess_mode})...")
+        with report.timed("preprocess"):
+            upload_path = await _stage(
+                "preprocess",
+                _to_thread(preprocess.preprocess, video_path, preprocess_mode),
+                timeouts,
+            )
+        print(f"  Reduced upload size: {preprocess.describe_reduction(video_path, upload_path)}")
+
+    print("  Uploading to Gemini...")
+    try:
+        start = time.monotonic()
+        with report.timed("upload"):
+            # Resumable, so a retry continues from the last chunk the server received
+            name = await _stage(
+                "upload",
+                retry.UPLOAD_POLICY.call_async(
+                    "upload", _files_api, uploads.upload_resumable,
+                    upload_path, video_hash, api_key(), upload_sessions,
+                ),
+                timeouts,
+            )
+            video_file = await retry.POLL_POLICY.call_async("poll", _files_api, genai.get_file, name)
+        elapsed = time.monotonic() - start
+        size_mb = os.path.getsize(upload_path) / (1024 * 1024)
+        print(f"  Uploaded {size_mb:.1f} MB in {elapsed:.1f}s ({size_mb / max(elapsed, 0.001):.1f} MB/s)")
+    finally:
+        if upload_path != video_path:
+            os.remove(upload_path)
+    upload_registry.record(video_hash, video_file, source_path or video_path)
+    return video_file
+
+async def wait_until_processed(video_file, video_hash, timeouts=STAGE_TIMEOUTS):
+    print("  Waiting for Gemini to process the video...")
+    with report.timed("processing"):
+        video_file = await _stage(
+            "processing", asyncio.wrap_future(file_poller.submit(video_file)), timeouts
+        )
+    if video_file.state.name == "FAILED":
+        await delete_remote(video_file.name, video_hash)
+        raise RuntimeError(f"Video processing failed for {video_file.name}.")
+    return video_file
+
+async def delete_remote(name, video_hash):
+    """Delete an uploaded file and drop it from the upload registry."""
+    with report.timed("delete"):
+        await retry.POLL_POLICY.call_async("delete", _files_api, genai.delete_file, name)
+    upload_registry.forget(video_hash)
+
+def sweep_remote_files():
+    """Delete remote files that are not a reusable upload for a video still in INPUT_DIR."""
+    keep = upload_registry.live_names()
+    deleted = 0
+    for remote in _list_files():
+        if remote.name in keep:
+            continue
+        print(f"  Deleting {remote.name} ({remote.display_name})")
+        try:
+            retry.POLL_POLICY.call("delete", _delete_file, remote.name)
+        except Exception as e:
+            print(f"  Could not delete {remote.name}: {e}")
+            continue
+        upload_registry.forget_name(remote.name)
+        deleted += 1
+    print(f"Deleted {deleted} orphaned remote file(s), kept {len(keep)}.")
+
+async def transcribe_video(video_path, video_hash, video_file, context, model_names, timeouts=STAGE_TIMEOUTS,
+                           duration=None):
+    """Save a transcript of a processed video to TRANSCRIPTS_DIR unless one of the same video exists."""
+    path = transcript_path(video_path)
+    if os.path.exists(path) and read_transcript(path)[1] == video_hash:
+        print(f"  Transcript already saved: {path}")
+        return path
+    print(f"  Transcribing with {model_names[0]}...")
+    # Names in the context help the transcript label speakers
+    render = lambda inline_context: (context_block(inline_context) if inline_context else "") + TRANSCRIPT_PROMPT
+    text = await _stage(
+        "generation",
+        generate_text(model_names, context, render, video_file, stage="transcription", duration=duration),
+        timeouts,
+    )
+    return await _to_thread(write_transcript, video_path, video_hash, text)
+
+def _format_offset(seconds):
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+async def summarize_segment(segment_path, segment_hash, video_path, context, render, timeouts,
+                            model=MODEL, fallback=True, duration=None):
+    """Take notes on one segment (duration seconds long) and delete its remote copy; returns the notes."""
+    video_file = await upload_video(segment_path, segment_hash, source_path=video_path, timeouts=timeouts)
+    video_file = await wait_until_processed(video_file, segment_hash, timeouts)
+    model_names = models_for(video_file, duration, model=model, fallback=fallback)
+    notes = await _stage(
+        "generation", generate_text(model_names, context, render, video_file, duration=duration), timeouts
+    )
+    await delete_remote(video_file.name, segment_hash)
+    return notes
+
+async def summarize_segments(video_path, video_hash, context, segment_minutes, preprocess_mode=preprocess.NONE,
+                             stream_path=None, timeouts=STAGE_TIMEOUTS, model=MODEL, fallback=True,
+                             structured=False):
+    """Map-reduce summary of a long recording.
+
+    The video is cut into segment_minutes-long parts which are uploaded and
+    summarized concurrently; the partial notes are then merged into the
+    sections of SUMMARY_PROMPT (or STRUCTURED_PROMPT's JSON with structured)
+    with one text-only request. Each segment's model is routed by the
+    segment's length, the merge by the whole recording's.
+    """
+    segment_seconds = segment_minutes * 60
+    print(f"  Splitting into {segment_minutes}-minute segments...")
+    with report.timed("preprocess"):
+        segment_paths = await _stage(
+            "preprocess",
+            _to_thread(preprocess.split_segments, video_path, segment_seconds, preprocess_mode),
+            timeouts,
+        )
+    count = len(segment_paths)
+    if not count:
+        raise RuntimeError(f"ffmpeg produced no segments for {video_path}.")
+    print(f"  Summarizing {count} segments...")
+
+    semaphore = asyncio.Semaphore(MAX_SEGMENT_WORKERS)
+
+    async def summarize_part(index, segment_path):
+        start = index * segment_seconds
+        instructions = SEGMENT_PROMPT.format(
+            index=index + 1,
+            count=count,
+            start=_format_offset(start),
+            end=_format_offset(start + segment_seconds),
+        )
+        render = lambda inline_context: build_prompt(video_path, inline_context, instructions)
+        segment_hash = f"{video_hash}:segment{segment_seconds}:{index}"
+        async with semaphore:
+            return await summarize_segment(
+                segment_path, segment_hash, video_path, context, render, timeouts, model, fallback,
+                segment_seconds,
+            )
+
+    tasks = [asyncio.create_task(summarize_part(index, path)) for index, path in enumerate(segment_paths)]
+    try:
+        notes = await asyncio.gather(*tasks)
+    finally:
+        # On failure or cancellation, stop the other segments before their files are removed
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        shutil.rmtree(os.path.dirname(segment_paths[0]), ignore_errors=True)
+
+    print("  Merging segment summaries...")
+    parts = "\n\n".join(
+        f"## Part {index} of {count}\n\n{text}" for index, text in enumerate(notes, start=1)
+    )
+    instructions = summary_instructions(structured)
+    render = lambda inline_context: MERGE_PROMPT.format(
+        parts=parts, prompt=build_prompt(video_path, inline_context, instructions)
+    )
+    model_names = models_for(duration=count * segment_seconds, model=model, fallback=fallback)
+    return await _stage(
+        "generation",
+        generate_text(model_names, context, render, stream_path=stream_path,
+                      generation_config=summary_generation_config(structured)),
+        timeouts,
+    )
+
+def summary_path(video_path):
+    base_name = os.path.basename(video_path)
+    return os.path.join(OUTPUT_DIR, os.path.splitext(base_name)[0] + "_summary.md")
+
+def summary_json_path(video_path):
+    """Where the structured summary is written next to the markdown."""
+    return os.path.splitext(summary_path(video_path))[0] + ".json"
+
+def partial_summary_path(video_path):
+    """Where a streamed summary is written while it is still being generated."""
+    return summary_path(video_path) + ".partial"
+
+def write_summary(video_path, text, streamed=False, structured=False):
+    """Write the summary markdown to OUTPUT_DIR; returns the output path.
+
+    With streamed, the text is already in the partial file and that file is
+    renamed into place instead. With structured, text is the JSON response:
+    it is saved next to the markdown, which is rendered from it.
+    """
+    output_path = summary_path(video_path)
+
+    if structured:
+        data = summary_schema.parse(text)
+        json_path = summary_json_path(video_path)
+        with open(json_path, "w") as f:
+            json.dump({"recording": os.path.basename(video_path), **data}, f, indent=2)
+        print(f"  Saved structured summary to: {json_path}")
+        with open(output_path, "w") as f:
+            f.write(summary_schema.render_markdown(data))
+    elif streamed:
+        os.replace(partial_summary_path(video_path), output_path)
+    else:
+        with open(output_path, "w") as f:
+            f.write(text)
+
+    print(f"  Saved summary to: {output_path}")
+    return output_path
+
+def transcript_path(video_path):
+    base_name = os.path.basename(video_path)
+    return os.path.join(TRANSCRIPTS_DIR, os.path.splitext(base_name)[0] + "_transcript.md")
+
+def write_transcript(video_path, video_hash, text):
+    """Save a transcript to TRANSCRIPTS_DIR, headed by the recording it came from; returns the path."""
+    path = transcript_path(video_path)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(f"<!-- source: {os.path.basename(video_path)} sha256: {video_hash} -->\n\n{text}")
+    os.replace(tmp_path, path)
+    print(f"  Saved transcript to: {path}")
+    return path
+
+def read_transcript(path):
+    """Return (source file name, video hash, text) for a transcript saved by write_transcript."""
+    with open(path, "r") as f:
+        header = f.readline()
+        text = f.read().lstrip("\n")
+    match = _TRANSCRIPT_HEADER.match(header)
+    if match is None:
+        # Not written by us; assume it is all transcript and named after the recording
+        name = os.path.basename(path).replace("_transcript.md", ".mov")
+        return name, None, header + text
+    return match.group(1), match.group(2), text
+
+def transcript_seconds(text):
+    """The last timestamp in a transcript, as a rough duration of the recording."""
+    timestamps = _TRANSCRIPT_TIMESTAMP.findall(text)
+    if not timestamps:
+        return None
+    hours, minutes, seconds = timestamps[-1]
+    return int(hours) * 3600 + int(minutes) * 60 + int(seconds)
+
+def archive_video(video_path):
+    """Move a summarized video to PROCESSED_DIR."""
+    base_name = os.path.basename(video_path)
+    shutil.move(video_path, os.path.join(PROCESSED_DIR, base_name))
+    print(f"  Moved video to: {PROCESSED_DIR}/{base_name}")
+
+async def _finish_recording(key, video_path, video_hash, text, remote_name, context_hash, timeouts,
+                            streamed=False, output_path=None, structured=False):
+    """Write a generated summary, archive the recording and delete its remote copy; returns the output path.
+
+    Each step is recorded in the job store. With output_path, the summary
+    was already written by an earlier run and only the later steps are done.
+    """
+    if output_path is None:
+        with report.timed("write"):
+            output_path = await _stage(
+                "save", _to_thread(write_summary, video_path, text, streamed, structured), timeouts
+            )
+        summary_index.record(output_path, context_hash)
+        job_store.advance(key, jobs.WRITTEN, output_path=output_path)
+
+    with report.timed("move"):
+        await _stage("save", _to_thread(archive_video, video_path), timeouts)
+    job_store.advance(key, jobs.ARCHIVED)
+
+    # Cleanup remote file
+    if remote_name:
+        await delete_remote(remote_name, video_hash)
+    job_store.advance(key, jobs.REMOTE_DELETED)
+    return output_path
+
+async def summarize_video_async(video_path, context=None, use_cache=True, preprocess_mode=preprocess.NONE,
+                                segment_minutes=None, stream=False, timeouts=None, slots=None,
+                                model=MODEL, fallback=True, transcribe=False, structured=False):
+    """Summarize one recording into OUTPUT_DIR and archive it; returns the output path or None on failure.
+
+    Progress is recorded in the job store after every stage, so a recording
+    interrupted by a crash resumes from its last completed stage.
+
+    model pins the Gemini model; by default one is routed per recording.
+    fallback allows switching to another model when the chosen one is
+    rate limited or overloaded.
+    transcribe also saves a transcript of the recording to TRANSCRIPTS_DIR.
+    structured asks for JSON following summary_schema.SCHEMA, saved next to
+    the markdown summary rendered from it.
+    timeouts overrides entries of STAGE_TIMEOUTS (seconds, None for no limit).
+    slots optionally maps "upload" and/or "generation" to semaphores shared
+    between jobs, limiting how many jobs can be in that stage at once.
+    Cancelling the task stops the pipeline at the next await; a blocking SDK
+    call already running on a worker thread finishes in the background.
+    """
+    timeouts = {**STAGE_TIMEOUTS, **(timeouts or {})}
+    slots = slots or {}
+    ensure_directories()
+    print(f"Processing: {video_path}")
+    file_report = report.begin_file(video_path)
+    metrics.jobs_in_flight.inc()
+
+    key = None
+    try:
+        if os.path.abspath(video_path) in batch_store.submitted_paths():
+            # Archiving it now would leave --collect without the recording
+            print("  Waiting in a batch job; run with --collect to save it.")
+            report.finish_file(file_report, "batched")
+            metrics.record_file(file_report)
+            return None
+
+        instructions = summary_instructions(structured)
+        prompt = build_prompt(video_path, context, instructions)
+        if context:
             print("  Using provided context...")
 
-        print("  Generating summary...")
-        model = genai.GenerativeModel(model_name=MODEL)
-        
-        response = None
-        for attempt in range(3):
-            try:
-                response = model.generate_content(
-                    [video_file, prompt],
-                    request_options={"timeout": 1200}
+        with report.timed("hash"):
+            video_hash = await _stage("hash", _to_thread(cache.hash_file, video_path), timeouts)
+        if preprocess_mode != preprocess.NONE:
+            # Preprocessed uploads are different content from the original video
+            video_hash = f"{video_hash}:{preprocess_mode}"
+        result_id = video_hash
+        if segment_minutes:
+            result_id = f"{video_hash}:segments{segment_minutes}"
+        key = cache.cache_key(result_id, prompt, model or routing.AUTO)
+
+        job = job_store.start(key, video_path, video_hash)
+        stage = job["stage"]
+        if stage != jobs.HASHED:
+            print(f"  Resuming after stage: {stage}")
+
+        text = _stored_summary(job["summary"], structured)
+        remote_name = job["remote_name"]
+        streamed = False
+        status = "resumed" if text is not None else "ok"
+        if text is None and use_cache:
+            text = _stored_summary(result_cache.get(key), structured)
+            if text is not None:
+                print("  Found cached summary for this recording, prompt and model.")
+                status = "cached"
+                stage = jobs.GENERATED
+                job_store.advance(key, stage, summary=text)
+
+        if text is None:
+            stream_path = partial_summary_path(video_path) if stream else None
+
+            if segment_minutes:
+                text = await summarize_segments(
+                    video_path, video_hash, context, segment_minutes, preprocess_mode, stream_path, timeouts,
+                    model, fallback, structured,
                 )
-                break
-            except Exception as e:
-                print(f"  Generation attempt {attempt + 1} failed: {e}")
-                if attempt == 2:
-                    raise
-                print("  Waiting 30 seconds before retrying...")
-                time.sleep(30)
-        
-        # Save output as markdown
-        base_name = os.path.basename(video_path)
-        output_filename = os.path.splitext(base_name)[0] + "_summary.md"
-        output_path = os.path.join(OUTPUT_DIR, output_filename)
-        
-        with open(output_path, "w") as f:
-            f.write(response.text)
-            
-        print(f"  Saved summary to: {output_path}")
-        
-        # Move to processed
-        shutil.move(video_path, os.path.join(PROCESSED_DIR, base_name))
-        print(f"  Moved video to: {PROCESSED_DIR}/{base_name}")
-        
-        # Cleanup remote file
-        genai.delete_file(video_file.name)
+            else:
+                async with slots.get("upload") or contextlib.nullcontext():
+                    # Upload the file, or reuse a live upload of the same bytes
+                    video_file = await upload_video(video_path, video_hash, preprocess_mode, timeouts=timeouts)
+                    remote_name = video_file.name
+                    job_store.advance(key, jobs.UPLOADED, remote_name=remote_name)
+
+                    video_file = await wait_until_processed(video_file, video_hash, timeouts)
+                    job_store.advance(key, jobs.ACTIVE)
+
+                async with slots.get("generation") or contextlib.nullcontext():
+                    # Judged by the original recording, not a (possibly much smaller) preprocessed upload
+                    duration = recording_seconds(video_file, video_path)
+                    model_names = models_for(video_file, duration, model=model, fallback=fallback)
+                    if transcribe:
+                        await transcribe_video(
+                            video_path, video_hash, video_file, context, model_names, timeouts, duration
+                        )
+                    print(f"  Generating summary with {model_names[0]}...")
+                    render = lambda inline_context: build_prompt(video_path, inline_context, instructions)
+                    text = await _stage(
+                        "generation",
+                        generate_text(model_names, context, render, video_file, stream_path,
+                                      generation_config=summary_generation_config(structured),
+                                      duration=duration),
+                        timeouts,
+                    )
+
+            check_summary(text, structured)
+            streamed = stream
+            result_cache.put(key, text)
+            stage = jobs.GENERATED
+            job_store.advance(key, stage, summary=text)
+
+        output_path = job["output_path"] if jobs.reached(stage, jobs.WRITTEN) else None
+        output_path = await _finish_recording(
+            key, video_path, video_hash, text, remote_name, cache.hash_text(context), timeouts, streamed, output_path,
+            structured,
+        )
+        report.finish_file(file_report, status)
+        metrics.record_file(file_report)
+        return output_path
+
+    except Exception as e:
+        print(f"  An error occurred: {e}")
+        if key is not None:
+            job_store.fail(key, e)
+        report.finish_file(file_report, "failed", e)
+        metrics.record_file(file_report)
+        return None
+
+    finally:
+        metrics.jobs_in_flight.dec()
+
+async def summarize_transcript_async(path, context=None, use_cache=True, stream=False, timeouts=None,
+                                     model=MODEL, fallback=True, skip_unchanged=False, revise=False,
+                                     structured=False):
+    """Summarize a saved transcript into OUTPUT_DIR; returns the output path or None on failure.
+
+    The summary prompt runs on the transcript text alone, so nothing is
+    uploaded and the recording doesn't need to be in INPUT_DIR. The summary
+    replaces any earlier one for the same recording.
+
+    skip_unchanged leaves a summary alone if it was made with the same context
+    (and transcript). revise asks the model to update the existing summary for
+    the new context instead of writing it from scratch; it doesn't apply to
+    structured summaries, which are always written from scratch.
+    """
+    timeouts = {**STAGE_TIMEOUTS, **(timeouts or {})}
+    ensure_directories()
+    print(f"Processing: {path}")
+    file_report = report.begin_file(path)
+    metrics.jobs_in_flight.inc()
+
+    try:
+        source_name, _, transcript = await _to_thread(read_transcript, path)
+        output_path = summary_path(source_name)
+        context_hash = cache.hash_text(context)
+        transcript_hash = cache.hash_text(transcript)
+        if (skip_unchanged and summary_index.is_current(output_path, context_hash, transcript_hash)
+                and (not structured or os.path.exists(summary_json_path(source_name)))):
+            print(f"  {output_path} is up to date with this context, skipping.")
+            report.finish_file(file_report, "skipped")
+            metrics.record_file(file_report)
+            return output_path
+
+        prefix = TRANSCRIPT_SUMMARY_PREFIX.format(transcript=transcript)
+        previous = None
+        if revise and not structured and os.path.exists(output_path):
+            with open(output_path, "r") as f:
+                previous = f.read()
+        if previous is not None:
+            print("  Revising the existing summary for the new context...")
+            instructions = REVISE_PROMPT.format(summary=previous)
+            render = lambda inline_context: prefix + (context_block(inline_context) if inline_context else "") + instructions
+        else:
+            instructions = summary_instructions(structured)
+            render = lambda inline_context: prefix + build_prompt(source_name, inline_context, instructions)
+        key = cache.cache_key("transcript", render(context), model or routing.AUTO)
+
+        text = _stored_summary(result_cache.get(key), structured) if use_cache else None
+        status = "ok"
+        if text is not None:
+            print("  Found cached summary for this transcript, prompt and model.")
+            status = "cached"
+        else:
+            model_names = models_for(duration=transcript_seconds(transcript), model=model, fallback=fallback)
+            stream_path = partial_summary_path(source_name) if stream else None
+            print(f"  Generating summary with {model_names[0]}...")
+            text = await _stage(
+                "generation",
+                generate_text(model_names, context, render, stream_path=stream_path,
+                              generation_config=summary_generation_config(structured)),
+                timeouts,
+            )
+            check_summary(text, structured)
+            result_cache.put(key, text)
+
+        with report.timed("write"):
+            output_path = await _stage(
+                "save",
+                _to_thread(write_summary, source_name, text, stream and status == "ok", structured),
+                timeouts,
+            )
+        summary_index.record(output_path, context_hash, transcript_hash)
+        report.finish_file(file_report, status)
+        metrics.record_file(file_report)
+        return output_path
+
+    except Exception as e:
+        print(f"  An error occurred: {e}")
+        report.finish_file(file_report, "failed", e)
+        metrics.record_file(file_report)
+        return None
+
+    finally:
+        metrics.jobs_in_flight.dec()
+
+async def prepare_batch_request(video_path, context=None, use_cache=True, preprocess_mode=preprocess.NONE,
+                                timeouts=None, model=MODEL, structured=False):
+    """Upload a recording for a batch job; returns (model name, key, batch request, video hash) or None.
+
+    None means the recording needs no batch request: it is already waiting in
+    one, it failed, or its summary was generated before and it has just been
+    finished the usual way.
+    """
+    timeouts = {**STAGE_TIMEOUTS, **(timeouts or {})}
+    ensure_directories()
+    print(f"Preparing: {video_path}")
+    prompt = build_prompt(video_path, context, summary_instructions(structured))
+    video_hash = await _stage("hash", _to_thread(cache.hash_file, video_path), timeouts)
+    if preprocess_mode != preprocess.NONE:
+        video_hash = f"{video_hash}:{preprocess_mode}"
+    key = cache.cache_key(video_hash, prompt, model or routing.AUTO)
+
+    if key in batch_store.submitted_keys():
+        print("  Already waiting in a batch job; run with --collect to save it.")
+        return None
+    job = job_store.start(key, video_path, video_hash)
+    stored = _stored_summary(job["summary"], structured)
+    if stored is None and use_cache:
+        stored = _stored_summary(result_cache.get(key), structured)
+    if stored is not None:
+        print("  Summary already generated, finishing it without a batch job.")
+        await summarize_video_async(
+            video_path, context, use_cache, preprocess_mode, timeouts=timeouts, model=model, fallback=False,
+            structured=structured,
+        )
+        return None
+
+    file_report = report.begin_file(video_path)
+    metrics.jobs_in_flight.inc()
+    try:
+        video_file = await upload_video(video_path, video_hash, preprocess_mode, timeouts=timeouts)
+        job_store.advance(key, jobs.UPLOADED, remote_name=video_file.name)
+        video_file = await wait_until_processed(video_file, video_hash, timeouts)
+        job_store.advance(key, jobs.ACTIVE)
+
+        # A batch runs on one model, and waits for quota instead of falling back
+        model_name = models_for(video_file, recording_seconds(video_file, video_path), model=model, fallback=False)[0]
+        request = batch.video_request(key, video_file, prompt, summary_generation_config(structured))
+        report.finish_file(file_report, "queued")
+        metrics.record_file(file_report)
+        return model_name, key, request, video_hash
+
+    except Exception as e:
+        print(f"  An error occurred: {e}")
+        job_store.fail(key, e)
+        report.finish_file(file_report, "failed", e)
+        metrics.record_file(file_report)
+        return None
+
+    finally:
+        metrics.jobs_in_flight.dec()
+
+async def submit_batch_async(mov_files, context, workers=1, structured=False, **options):
+    """Upload recordings and submit their summaries as batch jobs, one per model; returns the batch names.
+
+    Batch jobs are billed at a discount and don't count against the
+    per-minute quotas, but may take up to a day. They are recorded in the
+    batch store, and collect_batches_async saves their results later.
+    Extra keyword options are passed to prepare_batch_request.
+    """
+    _use_workers(workers)
+    semaphore = asyncio.Semaphore(workers)
+
+    async def prepare(video_path):
+        async with semaphore:
+            return video_path, await prepare_batch_request(video_path, context, structured=structured, **options)
+
+    groups = {}
+    for video_path, prepared in await asyncio.gather(*(prepare(path) for path in mov_files)):
+        if prepared is None:
+            continue
+        model_name, key, request, video_hash = prepared
+        requests, recordings = groups.setdefault(model_name, ([], {}))
+        requests.append(request)
+        recordings[key] = {
+            "video_path": video_path, "video_hash": video_hash, "context_hash": cache.hash_text(context),
+            "structured": structured,
+        }
+
+    names = []
+    for model_name, (requests, recordings) in groups.items():
+        display_name = f"meeting-summarizer-{time.strftime('%Y%m%d-%H%M%S')}"
+        name = await retry.GENERATE_POLICY.call_async(
+            "batch submit", _to_thread, batch.submit, api_key(), model_name, requests, display_name
+        )
+        batch_store.record(name, model_name, recordings)
+        print(f"Submitted {len(requests)} recordings to {model_name} as batch job {name}")
+        names.append(name)
+    return names
+
+async def _save_batch_result(key, recording, model_name, response, error, timeouts):
+    """Save one result of a finished batch job and archive its recording; returns the output path or None."""
+    video_path = recording["video_path"]
+    print(f"Collecting: {video_path}")
+    file_report = report.begin_file(video_path)
+    metrics.jobs_in_flight.inc()
+    try:
+        if error is not None:
+            raise RuntimeError(f"Batch request failed: {error.get('message', error)}")
+        text = batch.response_text(response)
+        report.note_model(model_name)
+        report.note_usage(batch.usage(response))
+        check_summary(text, recording.get("structured", False))
+        result_cache.put(key, text)
+
+        job = job_store.start(key, video_path, recording["video_hash"])
+        job_store.advance(key, jobs.GENERATED, summary=text)
+        output_path = await _finish_recording(
+            key, video_path, recording["video_hash"], text, job["remote_name"], recording["context_hash"], timeouts,
+            structured=recording.get("structured", False),
+        )
+        report.finish_file(file_report, "ok")
+        metrics.record_file(file_report)
+        return output_path
 
     except Exception as e:
         print(f"  An error occurred: {e}")
+        job_store.fail(key, e)
+        report.finish_file(file_report, "failed", e)
+        metrics.record_file(file_report)
+        return None
+
+    finally:
+        metrics.jobs_in_flight.dec()
+
+async def collect_batches_async(timeouts=None):
+    """Save the results of every finished batch job in the batch store.
+
+    Jobs still running are left for a later call. Recordings whose request
+    failed, or whose whole job failed or expired, stay in INPUT_DIR (with
+    their uploads reusable) for the next run. Returns
+    {video_path: output_path or None} for the recordings collected.
+    """
+    timeouts = {**STAGE_TIMEOUTS, **(timeouts or {})}
+    results = {}
+    for name, entry in batch_store.pending():
+        batch_job = await retry.POLL_POLICY.call_async("poll", _to_thread, batch.get, api_key(), name)
+        state = batch.state(batch_job)
+        recordings = dict(entry["recordings"])
+        if state in batch.RUNNING_STATES:
+            hours = (time.time() - entry["submitted"]) / 3600
+            print(f"{name}: {state}, {len(recordings)} recordings, submitted {hours:.1f}h ago")
+            continue
+        if state in batch.ENDED_STATES:
+            print(f"{name}: {state}; its {len(recordings)} recordings stay in '{INPUT_DIR}' for the next run")
+            batch_store.forget(name)
+            continue
+        if state != batch.SUCCEEDED:
+            # Unknown to this version; keep the batch rather than lose its results
+            print(f"{name}: unexpected state {state}, {len(recordings)} recordings; will check again next time")
+            continue
+
+        print(f"{name}: finished, saving {len(recordings)} summaries...")
+        for key, response, error in await _to_thread(lambda: list(batch.results(api_key(), batch_job))):
+            recording = recordings.pop(key, None)
+            if recording is None:
+                continue
+            output_path = await _save_batch_result(key, recording, entry["model"], response, error, timeouts)
+            results[recording["video_path"]] = output_path
+            status = f"saved {output_path}" if output_path else "FAILED"
+            print(f"{os.path.basename(recording['video_path'])}: {status}")
+        for recording in recordings.values():
+            print(f"{os.path.basename(recording['video_path'])}: no result in {name}, left in '{INPUT_DIR}'")
+            results[recording["video_path"]] = None
+        batch_store.forget(name)
+    return results
+
+async def finish_archived_jobs():
+    """Delete remote files left behind by jobs that were archived before a crash."""
+    for job in job_store.awaiting_remote_delete():
+        print(f"Cleaning up remote file {job['remote_name']} for {os.path.basename(job['video_path'])}...")
+        try:
+            await delete_remote(job["remote_name"], job["video_hash"])
+        except Exception as e:
+            if retry.status_code(e) not in (403, 404):
+                print(f"  Could not delete {job['remote_name']}: {e}")
+                continue
+            # Already deleted or expired
+            upload_registry.forget(job["video_hash"])
+        job_store.advance(job["key"], jobs.REMOTE_DELETED)
+
+def summarize_video(video_path, context=None, **options):
+    """Blocking wrapper around summarize_video_async."""
+    return asyncio.run(summarize_video_async(video_path, context, **options))
 
 def load_context(context_path):
     """Load context from a markdown file."""
@@ -157,6 +1149,162 @@ def load_context(context_path):
     with open(context_path, "r") as f:
         return f.read()
 
+async def process_files_async(mov_files, context, workers=1, pipeline=False, job=None, **options):
+    """Summarize videos with at most `workers` in flight, reporting each result as it finishes.
+
+    With pipeline (and a single worker), the next file is uploaded and
+    processed by Gemini while the current one is generating, keeping one
+    upload and one generation in progress at a time. Not available with
+    segment_minutes.
+    job is the coroutine function run for each file (default:
+    summarize_video_async); extra keyword options are passed through to it.
+    """
+    job = job or summarize_video_async
+    # Blocking SDK calls run on worker threads; make sure every in-flight job can get one
+    _use_workers(workers)
+    in_flight = workers
+    # Segmented recordings upload and generate their parts concurrently, which
+    # a single generation slot can't cover, so they aren't pipelined
+    if pipeline and workers == 1 and not options.get("segment_minutes"):
+        in_flight = 2
+        options["slots"] = {"upload": asyncio.Semaphore(1), "generation": asyncio.Semaphore(1)}
+    semaphore = asyncio.Semaphore(in_flight)
+    metrics.queue_depth.set(len(mov_files))
+
+    async def run(video_path):
+        async with semaphore:
+            metrics.queue_depth.dec()
+            return video_path, await job(video_path, context, **options)
+
+    results = {}
+    tasks = [asyncio.create_task(run(video_path)) for video_path in mov_files]
+    for done, task in enumerate(asyncio.as_completed(tasks), start=1):
+        video_path, output_path = await task
+        results[video_path] = output_path
+        status = f"saved {output_path}" if output_path else "FAILED"
+        print(f"[{done}/{len(mov_files)}] {os.path.basename(video_path)}: {status}")
+        if in_flight == 1:
+            print("-" * 30)
+    return results
+
+async def watch_async(context, workers=1, **options):
+    """Watch INPUT_DIR and summarize each .mov file once it is fully written.
+
+    Runs until SIGTERM or SIGINT, then stops taking new files, lets the jobs
+    already running finish and returns. Only one watcher may run at a time.
+    """
+    lock = watch.SingleInstanceLock()
+    lock.acquire()
+
+    loop = asyncio.get_running_loop()
+    _use_workers(workers)
+    stopping = asyncio.Event()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        try:
+            loop.add_signal_handler(sig, stopping.set)
+        except (NotImplementedError, RuntimeError):
+            signal.signal(sig, lambda *_: loop.call_soon_threadsafe(stopping.set))
+
+    watcher = watch.DirectoryWatcher(INPUT_DIR, ".mov")
+    mode = "inotify" if watcher.uses_inotify else "polling"
+    print(f"Watching '{INPUT_DIR}' for .mov files ({mode}, {workers} workers). Press Ctrl+C to stop.")
+
+    queue = asyncio.Queue()
+    queued = set()
+    failed = {}
+    batched = set()
+
+    async def worker():
+        while True:
+            video_path = await queue.get()
+            metrics.queue_depth.set(queue.qsize())
+            try:
+                if stopping.is_set():
+                    # Left in INPUT_DIR for the next run
+                    continue
+                output_path = await summarize_video_async(video_path, context, **options)
+                if output_path:
+                    print(f"[done] {os.path.basename(video_path)}: saved {output_path}")
+                else:
+                    failed[video_path] = watcher.signature(video_path)
+                    print(f"[done] {os.path.basename(video_path)}: FAILED (will retry if the file changes)")
+            finally:
+                queued.discard(video_path)
+                queue.task_done()
+
+    tasks = [asyncio.create_task(worker()) for _ in range(workers)]
+    try:
+        while not stopping.is_set():
+            for video_path in await watcher.wait_for_ready():
+                if video_path in queued:
+                    continue
+                if video_path in failed and failed[video_path] == watcher.signature(video_path):
+                    continue
+                if os.path.abspath(video_path) in batch_store.submitted_paths():
+                    if video_path not in batched:
+                        batched.add(video_path)
+                        print(f"[skip] {os.path.basename(video_path)}: waiting in a batch job; run with --collect")
+                    continue
+                failed.pop(video_path, None)
+                queued.add(video_path)
+                await queue.put(video_path)
+                metrics.queue_depth.set(queue.qsize())
+
+        print("Stopping: waiting for in-progress files to finish...")
+        await queue.join()
+    finally:
+        for task in tasks:
+            task.cancel()
+        watcher.close()
+        lock.release()
+
+def print_run_summary(run_report):
+    lines = run_report.summary_lines()
+    if lines:
+        print("-" * 30)
+        for line in lines:
+            print(line)
+    for line in retry.stats.report():
+        print(f"  {line}")
+
+def ensure_directories():
+    """Create the working folders; done when there is work to do rather than on import."""
+    for directory in (INPUT_DIR, OUTPUT_DIR, PROCESSED_DIR, TRANSCRIPTS_DIR):
+        os.makedirs(directory, exist_ok=True)
+
+def require_api_key():
+    """Exit with instructions if no API key is configured."""
+    try:
+        api_key()
+    except MissingAPIKeyError as e:
+        print(f"Error: {e}")
+        print("Please copy .env.example to .env and add your API key.")
+        exit(1)
+
+
+def hold_input_lock():
+    """Take the input-folder lock for the rest of the run, exiting if another instance holds it.
+
+    The lock is released when the process exits.
+    """
+    lock = watch.SingleInstanceLock()
+    try:
+        lock.acquire()
+    except watch.LockHeldError as e:
+        print(f"Error: {e}")
+        exit(1)
+    return lock
+
+
+def configure_rate_limits(model=MODEL, fallback=True, rpm=None, tpm=None):
+    """Set up the rate limiter of every model that may be used, overriding the default quotas if given."""
+    models = [model] if model else list(routing.MODELS)
+    if fallback:
+        models += [m for name in models for m in routing.FALLBACKS.get(name, ()) if m not in models]
+    for name in models:
+        limiter = ratelimit.configure(name, rpm=rpm, tpm=tpm)
+        print(f"Rate limit for {name}: {limiter.rpm} requests/min, {limiter.tpm} tokens/min")
+
 def main():
     parser = argparse.ArgumentParser(
         description="Summarize meeting videos using Google Gemini AI"
@@ -166,31 +1314,258 @@ def main():
         type=str,
         help="Path to a markdown file with additional context for the summary"
     )
+    parser.add_argument(
+        "--workers", "-w",
+        type=int,
+        default=1,
+        help="Number of videos to process concurrently (default: 1)"
+    )
+    parser.add_argument(
+        "--no-pipeline",
+        action="store_true",
+        help="With a single worker, don't upload the next video while the current one is being summarized"
+    )
+    parser.add_argument(
+        "--model",
+        help="Use this Gemini model for every recording (default: pick one per recording by length "
+             "and available quota)"
+    )
+    parser.add_argument(
+        "--no-fallback",
+        action="store_true",
+        help="Don't switch to another model when the chosen one is rate limited or overloaded"
+    )
+    parser.add_argument(
+        "--rpm",
+        type=int,
+        help="Requests per minute allowed per model (default: each model's free-tier quota)"
+    )
+    parser.add_argument(
+        "--tpm",
+        type=int,
+        help="Tokens per minute allowed per model (default: each model's free-tier quota)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Ignore cached summaries and always upload and summarize again"
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=cache.MAX_CACHE_BYTES // (1024 * 1024),
+        help="Maximum size of the summary cache in MB (default: %(default)s)"
+    )
+    parser.add_argument(
+        "--preprocess",
+        choices=preprocess.MODES,
+        default=preprocess.NONE,
+        help="Shrink recordings locally with ffmpeg before upload: 'low-res' re-encodes to 1 fps 480p, "
+             "'audio' uploads the audio track only (default: none)"
+    )
+    parser.add_argument(
+        "--segment-minutes",
+        type=int,
+        help="Split each recording into segments of this many minutes, summarize them in parallel "
+             "and merge the results (requires ffmpeg)"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream the summary into output/ as it is generated"
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Generate structured summaries: save the JSON next to each markdown summary, which is "
+             "rendered from it"
+    )
+    parser.add_argument(
+        "--transcript",
+        action="store_true",
+        help="Also save a timestamped, speaker-labeled transcript of each recording to 'transcripts'"
+    )
+    parser.add_argument(
+        "--from-transcripts",
+        action="store_true",
+        help="Summarize the transcripts saved in 'transcripts' instead of the videos in 'input' "
+             "(no upload; useful after changing the context)"
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Upload the recordings in 'input' and submit them as a discounted batch job that may take "
+             "up to a day, then exit; save the results later with --collect"
+    )
+    parser.add_argument(
+        "--collect",
+        action="store_true",
+        help="Save the summaries of finished batch jobs to 'output' and archive their recordings, then exit"
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and summarize new .mov files as they appear in 'input' (stop with SIGTERM/Ctrl+C)"
+    )
+    parser.add_argument(
+        "--report",
+        type=str,
+        help="Path of the JSON-lines run report (default: reports/run-<timestamp>.jsonl)"
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        help="Serve Prometheus metrics at http://<host>:<port>/metrics while running"
+    )
+    parser.add_argument(
+        "--metrics-host",
+        default="127.0.0.1",
+        help="Address for the metrics endpoint (default: %(default)s; use 0.0.0.0 to allow remote scrapes)"
+    )
+    parser.add_argument(
+        "--sweep",
+        action="store_true",
+        help="Delete every remote Gemini file that isn't a reusable upload for a video still in 'input', then exit"
+    )
     args = parser.parse_args()
 
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    if args.sweep:
+        require_api_key()
+        print("Sweeping orphaned remote files...")
+        sweep_remote_files()
+        return
+
+    result_cache.max_bytes = args.cache_size * 1024 * 1024
+    if args.preprocess != preprocess.NONE and not preprocess.ffmpeg_available():
+        parser.error(f"--preprocess {args.preprocess} requires ffmpeg on your PATH")
+    if args.segment_minutes is not None:
+        if args.segment_minutes < 1:
+            parser.error("--segment-minutes must be at least 1")
+        if not preprocess.ffmpeg_available():
+            parser.error("--segment-minutes requires ffmpeg on your PATH")
+
+    if args.json and args.stream:
+        parser.error("--json can't be combined with --stream")
+    if args.transcript and args.segment_minutes:
+        parser.error("--transcript can't be combined with --segment-minutes")
+    if args.from_transcripts and (args.watch or args.transcript or args.segment_minutes
+                                  or args.preprocess != preprocess.NONE):
+        parser.error("--from-transcripts can't be combined with --watch, --transcript, --segment-minutes "
+                     "or --preprocess")
+
+    if (args.batch or args.collect) and (args.watch or args.from_transcripts or args.transcript
+                                         or args.segment_minutes or args.stream):
+        parser.error("--batch and --collect can't be combined with --watch, --from-transcripts, --transcript, "
+                     "--segment-minutes or --stream")
+    if args.batch and args.collect:
+        parser.error("--batch and --collect can't be combined; submit first and collect in a later run")
+
+    if args.collect:
+        pending = batch_store.pending()
+        if not pending:
+            print("No batch jobs waiting to be collected.")
+            return
+        lock = hold_input_lock()
+        require_api_key()
+        ensure_directories()
+        asyncio.run(finish_archived_jobs())
+        run_report = report.start_run(args.report)
+        print(f"Checking {len(pending)} batch job(s)...")
+        asyncio.run(collect_batches_async())
+        print_run_summary(run_report)
+        print("All done!")
+        return
+
+    options = {
+        "use_cache": not args.no_cache,
+        "preprocess_mode": args.preprocess,
+        "segment_minutes": args.segment_minutes,
+        "stream": args.stream,
+        "model": args.model,
+        "fallback": not args.no_fallback,
+        "transcribe": args.transcript,
+        "structured": args.json,
+    }
+
+    # Find out whether there is anything to do before paying for the SDK import
+    ensure_directories()
+    if args.from_transcripts:
+        files = sorted(glob.glob(os.path.join(TRANSCRIPTS_DIR, "*_transcript.md")))
+        if not files:
+            print("No transcripts found in 'transcripts' folder.")
+            return
+    elif not args.watch:
+        # Don't pick up files a watcher (or another run) is already processing
+        lock = hold_input_lock()
+        print("Checking for .mov files in 'input' folder...")
+        files = glob.glob(os.path.join(INPUT_DIR, "*.mov"))
+        batched = batch_store.submitted_paths()
+        waiting = [path for path in files if os.path.abspath(path) in batched]
+        if waiting:
+            print(f"Skipping {len(waiting)} files waiting in batch jobs; run with --collect to save them.")
+            files = [path for path in files if os.path.abspath(path) not in batched]
+        if not files:
+            print("No .mov files found in 'input' folder.")
+            return
+    require_api_key()
+
+    configure_rate_limits(args.model, not args.no_fallback, args.rpm, args.tpm)
+
     # Load context if provided
     context = None
     if args.context:
         print(f"Loading context from: {args.context}")
         context = load_context(args.context)
 
-    print("Checking for .mov files in 'input' folder...")
-    mov_files = glob.glob(os.path.join(INPUT_DIR, "*.mov"))
+    if args.metrics_port:
+        metrics.serve(args.metrics_port, args.metrics_host)
+        print(f"Serving metrics at http://{args.metrics_host}:{args.metrics_port}/metrics")
 
-    if not mov_files:
-        print("No .mov files found in 'input' folder.")
+    asyncio.run(finish_archived_jobs())
+    run_report = report.start_run(args.report)
+
+    if args.from_transcripts:
+        print(f"Summarizing {len(files)} saved transcripts...")
+        asyncio.run(process_files_async(
+            files, context, args.workers, job=summarize_transcript_async,
+            use_cache=not args.no_cache, stream=args.stream, model=args.model, fallback=not args.no_fallback,
+            structured=args.json,
+        ))
+        print_run_summary(run_report)
+        print("All done!")
         return
 
-    for i, video_path in enumerate(mov_files):
-        summarize_video(video_path, context)
-        print("-" * 30)
-        
-        # Add a delay between requests to avoid hitting rate limits, 
-        # but skip the delay after the very last file
-        if i < len(mov_files) - 1:
-            print("  Waiting 15 seconds to respect API rate limits...")
-            time.sleep(15)
+    if args.batch:
+        print(f"Submitting {len(files)} files as a batch job...")
+        asyncio.run(submit_batch_async(
+            files, context, args.workers, use_cache=not args.no_cache, preprocess_mode=args.preprocess,
+            model=args.model, structured=args.json,
+        ))
+        print_run_summary(run_report)
+        print("Run with --collect later to save the summaries.")
+        return
+
+    if args.watch:
+        try:
+            asyncio.run(watch_async(context, args.workers, **options))
+        except watch.LockHeldError as e:
+            print(f"Error: {e}")
+            exit(1)
+        print_run_summary(run_report)
+        return
+
+    pipeline = args.workers == 1 and not args.no_pipeline and not args.segment_minutes and len(files) > 1
+    if args.workers > 1:
+        print(f"Processing {len(files)} files with {args.workers} workers...")
+    elif pipeline:
+        print(f"Processing {len(files)} files, uploading each while the previous one is summarized...")
+    # Pacing between files is handled by the shared rate limiters
+    asyncio.run(process_files_async(files, context, args.workers, pipeline, **options))
 
+    print_run_summary(run_report)
     print("All done!")
 
 if __name__ == "__main__":
@@ -0,0 +1,145 @@
+import json
+
+# Response schema for structured summaries, in the OpenAPI subset Gemini accepts.
+# Field order follows the sections of the markdown summary.
+SCHEMA = {
+    "type": "OBJECT",
+    "properties": {
+        "title": {"type": "STRING", "description": "Meeting title or topic"},
+        "date": {"type": "STRING", "nullable": True, "description": "Meeting date, YYYY-MM-DD if known"},
+        "duration": {"type": "STRING", "nullable": True},
+        "participants": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "name": {"type": "STRING"},
+                    "role": {"type": "STRING", "nullable": True},
+                },
+                "required": ["name"],
+            },
+        },
+        "executive_summary": {"type": "STRING"},
+        "discussion_points": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "topic": {"type": "STRING"},
+                    "details": {"type": "STRING"},
+                },
+                "required": ["topic", "details"],
+            },
+        },
+        "decisions": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "decision": {"type": "STRING"},
+                    "made_by": {"type": "STRING", "nullable": True},
+                    "conditions": {"type": "STRING", "nullable": True},
+                },
+                "required": ["decision"],
+            },
+        },
+        "action_items": {
+            "type": "ARRAY",
+            "items": {
+                "type": "OBJECT",
+                "properties": {
+                    "task": {"type": "STRING"},
+                    "owner": {"type": "STRING", "nullable": True},
+                    "deadline": {"type": "STRING", "nullable": True},
+                    "priority": {"type": "STRING", "enum": ["High", "Medium", "Low"]},
+                },
+                "required": ["task", "priority"],
+            },
+        },
+        "open_questions": {"type": "ARRAY", "items": {"type": "STRING"}},
+        "next_steps": {"type": "ARRAY", "items": {"type": "STRING"}},
+    },
+    "required": [
+        "title", "participants", "executive_summary", "discussion_points", "decisions", "action_items",
+        "open_questions", "next_steps",
+    ],
+}
+
+LIST_FIELDS = ("participants", "discussion_points", "decisions", "action_items", "open_questions", "next_steps")
+NOT_DISCUSSED = "Not discussed"
+
+
+def generation_config():
+    """generation_config for GenerativeModel.generate_content that makes the model answer with SCHEMA."""
+    return {"response_mime_type": "application/json", "response_schema": SCHEMA}
+
+
+def parse(text):
+    """The summary dict from a structured response; raises ValueError if it isn't a JSON object."""
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Structured summary is not valid JSON: {e}") from None
+    if not isinstance(data, dict):
+        raise ValueError("Structured summary is not a JSON object")
+    for field in LIST_FIELDS:
+        if not isinstance(data.get(field), list):
+            data[field] = []
+    return data
+
+
+def _cell(value):
+    """A markdown table cell: single line, pipes escaped."""
+    return " ".join(str(value or "-").split()).replace("|", "\\|")
+
+
+def _bullets(lines):
+    return "\n".join(f"- {line}" for line in lines) if lines else NOT_DISCUSSED
+
+
+def render_markdown(data):
+    """Render a structured summary as markdown with the sections of the unstructured summary prompt."""
+    participants = []
+    for participant in data["participants"]:
+        role = participant.get("role")
+        participants.append(f"{participant.get('name')} ({role})" if role else str(participant.get("name")))
+    overview = [
+        f"- **Topic:** {data.get('title') or NOT_DISCUSSED}",
+        f"- **Date:** {data.get('date') or NOT_DISCUSSED}",
+        f"- **Duration:** {data.get('duration') or NOT_DISCUSSED}",
+        "- **Participants:**" + ("".join(f"\n  - {name}" for name in participants) or f" {NOT_DISCUSSED}"),
+    ]
+
+    points = [f"**{point.get('topic')}**: {point.get('details')}" for point in data["discussion_points"]]
+
+    decisions = []
+    for decision in data["decisions"]:
+        line = str(decision.get("decision"))
+        if decision.get("made_by"):
+            line += f" (made by {decision['made_by']})"
+        if decision.get("conditions"):
+            line += f". Conditions: {decision['conditions']}"
+        decisions.append(line)
+
+    if data["action_items"]:
+        rows = [
+            f"| {_cell(item.get('task'))} | {_cell(item.get('owner'))} | {_cell(item.get('deadline'))} "
+            f"| {_cell(item.get('priority'))} |"
+            for item in data["action_items"]
+        ]
+        actions = "\n".join(["| Action Item | Owner | Deadline | Priority |",
+                             "|-------------|-------|----------|----------|", *rows])
+    else:
+        actions = NOT_DISCUSSED
+
+    sections = [
+        f"# {data.get('title') or 'Meeting Summary'}",
+        "## 1. Meeting Overview\n\n" + "\n".join(overview),
+        "## 2. Executive Summary\n\n" + (data.get("executive_summary") or NOT_DISCUSSED),
+        "## 3. Key Discussion Points\n\n" + _bullets(points),
+        "## 4. Decisions Made\n\n" + _bullets(decisions),
+        "## 5. Action Items\n\n" + actions,
+        "## 6. Open Questions / Parking Lot\n\n" + _bullets(data["open_questions"]),
+        "## 7. Next Steps\n\n" + _bullets(data["next_steps"]),
+    ]
+    return "\n\n".join(sections) + "\n"
@@ -0,0 +1,277 @@
+import http.client
+import io
+import json
+import mimetypes
+import os
+import threading
+import time
+import urllib.error
+import urllib.parse
+
+import jsonstore
+import report
+
+REGISTRY_PATH = os.path.join(".cache", "uploads.json")
+SESSIONS_PATH = os.path.join(".cache", "upload_sessions.json")
+# Gemini keeps uploaded files for 48 hours; assume slightly less if the API doesn't say
+DEFAULT_TTL = 47 * 60 * 60
+# Don't reuse a file that is about to expire mid-generation
+EXPIRY_MARGIN = 30 * 60
+
+# Resumable upload endpoint of the Gemini Files API
+UPLOAD_URL = "https://generativelanguage.googleapis.com/upload/v1beta/files"
+# Bytes sent per request; must be a multiple of 256 KiB
+CHUNK_SIZE = 8 * 1024 * 1024
+# Seconds to wait for one chunk to be accepted
+CHUNK_TIMEOUT = 300
+# Abandon an unfinished upload session after this long and start a fresh one
+SESSION_TTL = 24 * 60 * 60
+
+
+def _expiry_timestamp(video_file):
+    expiration = getattr(video_file, "expiration_time", None)
+    if expiration is not None and hasattr(expiration, "timestamp"):
+        try:
+            return expiration.timestamp()
+        except (OverflowError, OSError, ValueError):
+            pass
+    return time.time() + DEFAULT_TTL
+
+
+class UploadRegistry(jsonstore.JsonStore):
+    """Maps a video's content hash to the remote Gemini file holding the same bytes.
+
+    Entries survive across runs in a small JSON file so a retry or re-run can
+    skip the upload while the remote copy is still alive.
+    """
+
+    def __init__(self, path=REGISTRY_PATH):
+        super().__init__(path)
+
+    def lookup(self, video_hash):
+        """Return the remote file name for this hash if it hasn't expired, else None."""
+        with self._lock:
+            entry = self._load().get(video_hash)
+            if entry is None:
+                return None
+            if entry["expires"] - EXPIRY_MARGIN < time.time():
+                del self._entries[video_hash]
+                self._save()
+                return None
+            return entry["name"]
+
+    def record(self, video_hash, video_file, source):
+        with self._lock:
+            self._load()[video_hash] = {
+                "name": video_file.name,
+                "expires": _expiry_timestamp(video_file),
+                "source": source,
+            }
+            self._save()
+
+    def forget(self, video_hash):
+        with self._lock:
+            if self._load().pop(video_hash, None) is not None:
+                self._save()
+
+    def forget_name(self, name):
+        with self._lock:
+            entries = self._load()
+            for video_hash in [h for h, e in entries.items() if e["name"] == name]:
+                del entries[video_hash]
+            self._save()
+
+    def live_names(self):
+        """Remote file names still worth keeping: unexpired and with the source still waiting to be processed."""
+        with self._lock:
+            now = time.time()
+            return {
+                entry["name"]
+                for entry in self._load().values()
+                if entry["expires"] > now and os.path.exists(entry["source"])
+            }
+
+
+class UploadSessions(jsonstore.JsonStore):
+    """Unfinished resumable uploads by video hash, so a retry or a restarted run can continue them."""
+
+    def __init__(self, path=SESSIONS_PATH):
+        super().__init__(path)
+
+    def lookup(self, video_hash, size):
+        """Return the saved session for this hash if it is recent and for the same size, else None."""
+        with self._lock:
+            entry = self._load().get(video_hash)
+            if entry is None:
+                return None
+            if entry["size"] != size or entry["created_at"] + SESSION_TTL < time.time():
+                del self._entries[video_hash]
+                self._save()
+                return None
+            return dict(entry)
+
+    def record(self, video_hash, url, size, offset=0):
+        with self._lock:
+            entry = self._load().setdefault(video_hash, {"created_at": time.time()})
+            entry.update(url=url, size=size, offset=offset)
+            self._save()
+
+    def forget(self, video_hash):
+        with self._lock:
+            if self._load().pop(video_hash, None) is not None:
+                self._save()
+
+
+class ConnectionPool:
+    """Keep-alive HTTPS connections, one per thread and host, reused across chunks and files.
+
+    Sending hundreds of chunks per recording over fresh connections would pay
+    a TCP and TLS handshake for each one.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _connection(self, scheme, host, timeout):
+        connections = self._local.__dict__.setdefault("connections", {})
+        connection = connections.get((scheme, host))
+        if connection is None:
+            connection_class = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            connection = connection_class(host, timeout=timeout)
+            connections[(scheme, host)] = connection
+        connection.timeout = timeout
+        return connection
+
+    def _discard(self, scheme, host):
+        connection = self._local.__dict__.get("connections", {}).pop((scheme, host), None)
+        if connection is not None:
+            connection.close()
+
+    def request(self, method, url, headers, data, timeout):
+        """Send a request and return (status, reason, headers, body), reconnecting once if a kept-alive connection was closed."""
+        parts = urllib.parse.urlsplit(url)
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        for attempt in (1, 2):
+            connection = self._connection(parts.scheme, parts.netloc, timeout)
+            reused = connection.sock is not None
+            try:
+                connection.request(method, path, body=data, headers=headers)
+                response = connection.getresponse()
+                body = response.read()
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError) as e:
+                self._discard(parts.scheme, parts.netloc)
+                if reused and attempt == 1:
+                    # The server closed an idle connection; try once more on a fresh one
+                    continue
+                raise ConnectionError(f"{method} {parts.path} failed: {e}") from e
+            except (OSError, http.client.HTTPException) as e:
+                self._discard(parts.scheme, parts.netloc)
+                if isinstance(e, TimeoutError):
+                    raise
+                raise ConnectionError(f"{method} {parts.path} failed: {e}") from e
+            if response.will_close:
+                self._discard(parts.scheme, parts.netloc)
+            return response.status, response.reason, response.headers, body
+
+
+_pool = ConnectionPool()
+
+
+def send(method, url, headers, data=None, timeout=CHUNK_TIMEOUT):
+    """Send a request to the Gemini API over the shared keep-alive connections; returns (headers, body).
+
+    Error statuses raise urllib.error.HTTPError, which carries the status code
+    and headers that retry.classify and retry.retry_after understand.
+    """
+    status, reason, response_headers, body = _pool.request(method, url, headers, data, timeout)
+    if status >= 400:
+        raise urllib.error.HTTPError(url, status, f"{reason}: {body[:500]!r}", response_headers, io.BytesIO(body))
+    return response_headers, body
+
+
+def _request(url, headers, data=b"", timeout=CHUNK_TIMEOUT):
+    """POST to the upload endpoint; returns (headers, parsed JSON body or None)."""
+    response_headers, body = send("POST", url, headers, data, timeout)
+    return response_headers, json.loads(body) if body else None
+
+
+def _start_session(api_key, size, mime_type, display_name):
+    headers = {
+        "x-goog-api-key": api_key,
+        "X-Goog-Upload-Protocol": "resumable",
+        "X-Goog-Upload-Command": "start",
+        "X-Goog-Upload-Header-Content-Length": str(size),
+        "X-Goog-Upload-Header-Content-Type": mime_type,
+        "Content-Type": "application/json",
+    }
+    body = json.dumps({"file": {"display_name": display_name}}).encode("utf-8")
+    response_headers, _ = _request(UPLOAD_URL, headers, body)
+    url = response_headers.get("X-Goog-Upload-URL")
+    if not url:
+        raise RuntimeError("Upload session was not created: no X-Goog-Upload-URL in the response")
+    return url
+
+
+def _query_offset(url):
+    """Bytes the server has received for a session, or None if the session can't be continued."""
+    try:
+        headers, _ = _request(url, {"X-Goog-Upload-Command": "query"})
+    except urllib.error.HTTPError as e:
+        if e.code in (400, 404, 410):
+            return None
+        raise
+    if headers.get("X-Goog-Upload-Status") != "active":
+        return None
+    return int(headers.get("X-Goog-Upload-Size-Received") or 0)
+
+
+def upload_resumable(path, video_hash, api_key, sessions, display_name=None, chunk_size=CHUNK_SIZE):
+    """Upload a file with the resumable upload protocol and return the remote file name.
+
+    The session URL and offset are saved in sessions after every chunk, so if
+    the upload fails (or the process dies) calling this again with the same
+    video_hash continues from the last byte the server received.
+    """
+    size = os.path.getsize(path)
+    mime_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    display_name = display_name or os.path.basename(path)
+
+    offset = None
+    session = sessions.lookup(video_hash, size)
+    if session is not None:
+        offset = _query_offset(session["url"])
+        if offset is None:
+            sessions.forget(video_hash)
+    if offset is None:
+        url = _start_session(api_key, size, mime_type, display_name)
+        offset = 0
+        sessions.record(video_hash, url, size)
+    else:
+        url = session["url"]
+        if offset:
+            print(f"  Resuming upload at {offset / (1024 * 1024):.1f} of {size / (1024 * 1024):.1f} MB")
+            report.note_upload_resume()
+
+    result = None
+    with open(path, "rb") as f:
+        f.seek(offset)
+        while True:
+            chunk = f.read(chunk_size)
+            last = offset + len(chunk) >= size
+            headers = {
+                "X-Goog-Upload-Command": "upload, finalize" if last else "upload",
+                "X-Goog-Upload-Offset": str(offset),
+                "Content-Length": str(len(chunk)),
+            }
+            _, result = _request(url, headers, chunk)
+            offset += len(chunk)
+            report.note_upload(len(chunk))
+            if last:
+                break
+            sessions.record(video_hash, url, size, offset)
+
+    sessions.forget(video_hash)
+    remote = (result or {}).get("file") or {}
+    if "name" not in remote:
+        raise RuntimeError(f"Upload of {path} finished without a file in the response")
+    return remote["name"]
@@ -0,0 +1,175 @@
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+
+LOCK_PATH = os.path.join(".cache", "watch.lock")
+
+# Rescan the folder this often, even when inotify is available
+POLL_INTERVAL = 2.0
+# Without a close-write event, a file counts as complete once its size and
+# modification time haven't changed for this long
+STABLE_SECONDS = 10.0
+
+# inotify event flags (see inotify(7))
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class LockHeldError(RuntimeError):
+    pass
+
+
+class SingleInstanceLock:
+    """An exclusive lock file so only one instance processes the input folder at a time."""
+
+    def __init__(self, path=LOCK_PATH):
+        self.path = path
+        self._file = None
+
+    def acquire(self):
+        """Take the lock, raising LockHeldError if another instance holds it."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._file = open(self.path, "a+")
+        try:
+            import fcntl
+        except ImportError:
+            # No flock on this platform; fall back to running unlocked
+            return
+        try:
+            fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._file.close()
+            self._file = None
+            raise LockHeldError(f"Another instance is already processing the input folder (lock held on {self.path})")
+        self._file.seek(0)
+        self._file.truncate()
+        self._file.write(f"{os.getpid()}\n")
+        self._file.flush()
+
+    def release(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class _Inotify:
+    """Minimal ctypes binding for inotify on Linux."""
+
+    def __init__(self, directory):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+
+    def wait(self, timeout):
+        """Block up to timeout seconds for events; returns (mask, name) pairs."""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset < len(data):
+            _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0").decode(errors="replace")
+            offset += length
+            events.append((mask, name))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class DirectoryWatcher:
+    """Reports files in a directory once they are fully written.
+
+    Uses inotify where available so a file closed after writing (or moved in)
+    is picked up immediately; other files count as complete once their size
+    and modification time have been stable for stable_seconds. The folder is
+    also rescanned every poll_interval, which is all that happens when
+    inotify isn't available.
+    """
+
+    def __init__(self, directory, suffix, stable_seconds=STABLE_SECONDS, poll_interval=POLL_INTERVAL):
+        self.directory = directory
+        self.suffix = suffix
+        self.stable_seconds = stable_seconds
+        self.poll_interval = poll_interval
+        self._seen = {}
+        self._closed = set()
+        try:
+            self._inotify = _Inotify(directory)
+        except (OSError, AttributeError):
+            self._inotify = None
+
+    @property
+    def uses_inotify(self):
+        return self._inotify is not None
+
+    async def wait_for_ready(self):
+        """Wait up to poll_interval for changes, then return the paths that are ready."""
+        if self._inotify is not None:
+            events = await asyncio.to_thread(self._inotify.wait, self.poll_interval)
+            for mask, name in events:
+                if not name.endswith(self.suffix):
+                    continue
+                path = os.path.join(self.directory, name)
+                if mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                    self._closed.add(path)
+                elif mask & (IN_MODIFY | IN_CREATE):
+                    # Being (re)written: not complete until the next close or move
+                    self._closed.discard(path)
+        else:
+            await asyncio.sleep(self.poll_interval)
+        return self._scan()
+
+    def _scan(self):
+        now = asyncio.get_running_loop().time()
+        ready = []
+        present = set()
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(self.suffix) or not entry.is_file():
+                continue
+            path = entry.path
+            present.add(path)
+            stat = entry.stat()
+            signature = (stat.st_size, stat.st_mtime)
+            previous = self._seen.get(path)
+            if previous is None or previous[0] != signature:
+                self._seen[path] = (signature, now)
+                if path not in self._closed:
+                    continue
+            elif path not in self._closed and now - previous[1] < self.stable_seconds:
+                continue
+            ready.append(path)
+
+        for path in set(self._seen) - present:
+            del self._seen[path]
+        self._closed &= present
+        return ready
+
+    def signature(self, path):
+        """The (size, mtime) last seen for a path, used to notice when a failed file is replaced."""
+        entry = self._seen.get(path)
+        return entry[0] if entry else None
+
+    def close(self):
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None